@@ -0,0 +1,90 @@
+# batch.py
+# 무인 배치 실행: 소스 수집 → 원문 추출/Potens 정규화(병렬) → 스냅샷 저장
+#   python batch.py                    → 공공기관 3곳, 증분 모드
+#   python batch.py --full --workers 8 → 전체 다시 처리, 동시 8건
+#   cron 예) */30 * * * * cd /app/09.05 && python batch.py >> /var/log/policylens-batch.log 2>&1
+# 결과는 <DATA_DIR>/snapshots.sqlite3에 BATCH_LABEL로 저장되고, 앱은 첫 화면에서 최신 배치 결과를 읽는다.
+# 출력: 단계별 소요 시간, 처리량(문서/초), Potens 호출 수, 캐시 통계
+
+import os
+import sys
+import time
+import fcntl
+import argparse
+
+from cache import DATA_DIR
+from fetcher import CONTENT_CACHE
+from normalizer import NORM_CACHE, POTENS_CALLER, has_api_key
+from resilience import stats_text
+from pipeline import summarize_all, ingest_summary, SUMMARY_WORKERS
+from search import SEARCH_INDEX, parse_date
+from snapshots import SNAPSHOTS, BATCH_LABEL
+from sources import collect_sources, SOURCES, SOURCE_TIMEOUT, COLLECT_DEADLINE, FEED_CACHE
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(description="Hi-PolicyLens 배치 실행 (수집 → 정규화 → 저장)")
+    ap.add_argument("--workers", type=int, default=SUMMARY_WORKERS, help="동시 처리 문서 수")
+    ap.add_argument("--limit", type=int, default=60, help="최신 순 처리 문서 수 상한")
+    ap.add_argument("--full", action="store_true", help="증분 모드 끄기(모든 문서 다시 처리)")
+    ap.add_argument("--feed", action="append", default=[], help="RSS 주소 (지정하면 기본 소스 대신 사용, 여러 번 가능)")
+    return ap.parse_args(argv)
+
+def main(argv):
+    args = parse_args(argv)
+    # cron 주기가 실행 시간보다 짧아도 겹쳐 돌지 않도록 잠금
+    os.makedirs(DATA_DIR, exist_ok=True)
+    lock = open(os.path.join(DATA_DIR, "batch.lock"), "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print("이전 배치가 아직 실행 중입니다. 건너뜁니다.")
+        return 2
+    if not has_api_key():
+        print("경고: POTENS_API_KEY가 없어 제목 기반 폴백 항목만 저장됩니다.")
+
+    t_all = time.monotonic()
+    timings = {}
+
+    # 1) 수집
+    t0 = time.monotonic()
+    sources = [{"type":"rss", "url":u} for u in args.feed] or SOURCES
+    entries, statuses = collect_sources(sources, timeout=SOURCE_TIMEOUT, deadline=COLLECT_DEADLINE)
+    SEARCH_INDEX.add_entries(entries)
+    entries.sort(key=lambda x: parse_date(x["pubDate"]) or 0, reverse=True)  # RSS(RFC 822)·크롤러(ISO) 날짜 혼재
+    rows = entries[:args.limit]
+    timings["collect"] = time.monotonic() - t0
+    for s in statuses:
+        print(f"[collect] {s['status']:>7} {s['count']:>4} items {s['elapsed']:>6}s  {s['url']}" + (f"  ({s['error']})" if s["error"] else ""))
+    cs = FEED_CACHE.stats
+    print(f"[collect] {len(entries)} entries → {len(rows)} rows in {timings['collect']:.2f}s "
+          f"(feed cache: fresh {cs['fresh']} · 304 {cs['revalidated']} · miss {cs['miss']} · stale {cs['stale']})")
+    if not rows:
+        print("수집된 항목이 없습니다.")
+        return 1
+
+    # 2) 원문 추출 + 정규화
+    t0 = time.monotonic()
+    by_row, p = {}, None
+    for i, items, p in summarize_all(rows, workers=args.workers, incremental=not args.full):
+        by_row[i] = items
+        if p["done"] % 10 == 0 or p["done"] == p["total"]:
+            print(f"[normalize] {p['done']}/{p['total']} · {p['rate']:.2f} docs/s · eta {p['eta']:.0f}s · calls {p['calls']}")
+    acc = [it for i in sorted(by_row) for it in by_row[i]]
+    timings["normalize"] = time.monotonic() - t0
+    cs, ns = CONTENT_CACHE.stats, NORM_CACHE.stats
+    print(f"[normalize] {len(rows)} docs → {len(acc)} items in {timings['normalize']:.2f}s "
+          f"({len(rows)/max(timings['normalize'], 1e-9):.2f} docs/s) — {ingest_summary(p)}")
+    print(f"[normalize] content cache: mem {cs['mem_hit']} · disk {cs['disk_hit']} · download {cs['miss']} | "
+          f"normalize cache: hit {ns['hit']} · api {ns['miss']}")
+    print(f"[normalize] {stats_text(POTENS_CALLER)}")
+
+    # 3) 저장
+    t0 = time.monotonic()
+    meta = {"rows": rows, "statuses": statuses, "progress": p, "timings": dict(timings)}
+    sid = SNAPSHOTS.save(acc, label=BATCH_LABEL, meta=meta)
+    print(f"[store] snapshot #{sid} ({len(acc)} items) in {time.monotonic() - t0:.2f}s")
+    print(f"[total] {time.monotonic() - t_all:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
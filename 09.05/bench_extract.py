@@ -0,0 +1,63 @@
+# bench_extract.py
+# html_to_text 추출기 처리량 비교 (마이크로 벤치마크)
+#   python bench_extract.py                 → 원문 캐시(content.sqlite3)에 저장된 실제 페이지 사용
+#   python bench_extract.py a.html pages/   → 지정한 HTML 파일/폴더 사용
+# 출력: 추출기별 페이지/초, MB/초 (legacy = 예전 전체 파싱 방식)
+
+import os
+import sys
+import time
+import sqlite3
+
+from bs4 import BeautifulSoup
+
+from cache import DATA_DIR
+from fetcher import EXTRACTORS, TEXT_LIMIT
+
+def legacy_html_to_text(html: str, limit=None) -> str:
+    soup = BeautifulSoup(html or "", "html.parser")
+    for t in soup(["script","style","noscript"]): t.extract()
+    return " ".join(soup.get_text(" ").split())
+
+def load_pages(paths):
+    pages = []
+    if not paths:
+        db = os.path.join(DATA_DIR, "content.sqlite3")
+        if os.path.exists(db):
+            con = sqlite3.connect(db)
+            pages = [(url, html) for url, html in con.execute("SELECT url, html FROM pages") if html]
+            con.close()
+        return pages
+    for p in paths:
+        files = [os.path.join(p, f) for f in sorted(os.listdir(p))] if os.path.isdir(p) else [p]
+        for fp in files:
+            if fp.endswith((".html", ".htm")):
+                with open(fp, "r", encoding="utf-8", errors="replace") as f:
+                    pages.append((fp, f.read()))
+    return pages
+
+def bench(fn, pages, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _, html in pages: fn(html, TEXT_LIMIT)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main(argv):
+    pages = load_pages(argv)
+    if not pages:
+        print("페이지가 없습니다. HTML 파일/폴더를 지정하거나 앱에서 먼저 요약을 실행해 캐시를 채우세요.")
+        return 1
+    mb = sum(len(h.encode("utf-8")) for _, h in pages) / 1e6
+    print(f"pages={len(pages)}  total={mb:.2f}MB  limit={TEXT_LIMIT}")
+    runs = {"legacy": legacy_html_to_text, **EXTRACTORS}
+    base = None
+    for name, fn in runs.items():
+        sec = bench(fn, pages)
+        base = base or sec
+        print(f"{name:>8}: {len(pages)/sec:8.1f} pages/s  {mb/sec:7.2f} MB/s  x{base/sec:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
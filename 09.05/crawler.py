@@ -0,0 +1,270 @@
+# crawler.py
+# HTML 목록형 소스(ECHA legislation 등)용 증분 크롤러
+# - 소스별 규칙(CRAWL_RULES): 목록 링크/다음 페이지 셀렉터, 포함 패턴, 페이지 깊이/항목 수 상한
+# - 목록 페이지를 깊이 제한까지 따라가며 링크 수집 → 세부 페이지를 병렬로 방문해 게시일 추출
+# - 예의: robots.txt 준수, 호스트별 동시 요청 수 + 요청 간 최소 간격 제한(프로세스 공용)
+# - 프런티어(<DATA_DIR>/crawl.sqlite3): 페이지별 ETag/Last-Modified/본문 해시/게시일을 저장해
+#   다음 실행에서는 새 페이지나 재방문 주기가 지난 페이지만 조건부 GET으로 다시 받는다
+# - 받은 세부 페이지는 원문 캐시에도 넣어 요약 단계에서 다시 다운로드하지 않음
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse, urljoin, urldefrag
+from urllib.robotparser import RobotFileParser
+from bs4 import BeautifulSoup
+
+from cache import DATA_DIR
+from fetcher import download, decode_body, html_to_text, CONTENT_CACHE, SESSION, USER_AGENT
+
+HOST_CONCURRENCY = 2   # 호스트별 동시 요청 수
+CRAWL_DELAY = 0.3      # 같은 호스트 요청 간 최소 간격(초)
+CRAWL_WORKERS = 6      # 세부 페이지 방문 스레드 수 (호스트 제한이 우선)
+
+DEFAULT_RULE = {
+    "items": ["main a[href]", "#content a[href]", "a[href]"],  # 앞에서부터 시도, 처음으로 링크가 나오는 셀렉터 사용
+    "next": ["a[rel~=next]", "li.next a[href]", "a.next[href]", ".pagination .next a[href]"],
+    "include": None,       # 링크 URL 정규식 (None이면 전부)
+    "min_title": 8,        # 너무 짧은 링크 텍스트(메뉴 등) 제외
+    "max_pages": 3,        # 목록 페이지 깊이 상한
+    "max_items": 40,       # 세부 페이지 방문 상한
+    "revisit": 24 * 3600,  # 이 시간 안에 확인한 세부 페이지는 다시 받지 않음(초)
+}
+
+CRAWL_RULES = {
+    "echa.europa.eu": {
+        "items": ["#main-content a[href]", "#content a[href]", "main a[href]", "a[href]"],
+        "include": re.compile(r"legislation|regulation|directive|law", re.I),
+    },
+}
+
+def rule_for(url: str) -> dict:
+    host = (urlparse(url).hostname or "").lower()
+    for suffix, rule in CRAWL_RULES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return {**DEFAULT_RULE, **rule}
+    return dict(DEFAULT_RULE)
+
+# --- 게시일 추출 ---
+_META_DATES = ["meta[property='article:published_time']", "meta[name='DC.date.issued']", "meta[name='dcterms.issued']",
+               "meta[name='DC.date']", "meta[name='date']", "meta[name='pubdate']", "meta[property='article:modified_time']"]
+_MONTHS = {m: i for i, m in enumerate(["january","february","march","april","may","june","july","august",
+                                       "september","october","november","december"], 1)}
+_DATE_PATTERNS = [
+    (re.compile(r"\b(20\d{2})-(\d{1,2})-(\d{1,2})\b"), lambda m: (m[1], m[2], m[3])),
+    (re.compile(r"\b(20\d{2})\.\s?(\d{1,2})\.\s?(\d{1,2})"), lambda m: (m[1], m[2], m[3])),
+    (re.compile(r"\b(\d{1,2})[./](\d{1,2})[./](20\d{2})\b"), lambda m: (m[3], m[2], m[1])),  # 유럽식 일/월/년
+    (re.compile(r"\b(\d{1,2})\s+(" + "|".join(_MONTHS) + r")\s+(20\d{2})\b", re.I),
+     lambda m: (m[3], _MONTHS[m[2].lower()], m[1])),
+]
+
+def _valid_date(y, mo, d) -> str:
+    try:
+        return datetime(int(y), int(mo), int(d)).strftime("%Y-%m-%d")
+    except ValueError:
+        return ""
+
+def extract_published(soup) -> str:
+    """세부 페이지 → 게시일 "YYYY-MM-DD" (메타 태그 → <time> → 본문 앞부분 날짜 패턴). 못 찾으면 ""."""
+    for sel in _META_DATES + ["time[datetime]"]:
+        tag = soup.select_one(sel)
+        value = tag and (tag.get("content") or tag.get("datetime"))
+        m = value and re.match(r"(\d{4})-(\d{1,2})-(\d{1,2})", value.strip())
+        if m and _valid_date(*m.groups()): return _valid_date(*m.groups())
+    text = soup.get_text(" ", strip=True)[:5000]
+    for pattern, parts in _DATE_PATTERNS:
+        for m in pattern.finditer(text):
+            date = _valid_date(*parts(m))
+            if date: return date
+    return ""
+
+# --- 예의: robots.txt + 호스트별 동시성/간격 ---
+class HostLimiter:
+    """호스트별 동시 요청 수(세마포어)와 요청 시작 간 최소 간격을 지킨다. 프로세스 공용."""
+    def __init__(self, per_host=HOST_CONCURRENCY, delay=CRAWL_DELAY):
+        self.per_host, self.delay = per_host, delay
+        self._sems, self._next_at = {}, {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            sem = self._sems.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_at.get(host, now))
+                self._next_at[host] = start + self.delay
+            if start > now: time.sleep(start - now)
+            yield
+
+HOST_LIMITER = HostLimiter()
+_ROBOTS, _ROBOTS_LOCK = {}, threading.Lock()
+
+def robots_allowed(url: str) -> bool:
+    parts = urlparse(url)
+    base = f"{parts.scheme}://{parts.netloc}"
+    with _ROBOTS_LOCK:
+        rp = _ROBOTS.get(base)
+    if rp is None:
+        rp = RobotFileParser()
+        try:
+            r = SESSION.get(base + "/robots.txt", timeout=3)
+            rp.parse(r.text.splitlines() if r.status_code == 200 else [])
+        except Exception:
+            rp.parse([])  # robots.txt를 못 받으면 허용으로 간주
+        with _ROBOTS_LOCK:
+            _ROBOTS[base] = rp
+    return rp.can_fetch(USER_AGENT, url)
+
+# --- 프런티어(방문 기록) ---
+class Frontier:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, "crawl.sqlite3")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS pages(
+            url TEXT PRIMARY KEY, kind TEXT, etag TEXT, last_modified TEXT, content_hash TEXT,
+            published TEXT, links TEXT, crawled_at REAL, changed_at REAL)""")
+        self._db.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified, content_hash, published, links, crawled_at, changed_at "
+                                   "FROM pages WHERE url = ?", (url,)).fetchone()
+        if not row: return None
+        return {"etag": row[0] or "", "last_modified": row[1] or "", "content_hash": row[2] or "", "published": row[3] or "",
+                "links": json.loads(row[4] or "null"), "crawled_at": row[5] or 0.0, "changed_at": row[6] or 0.0}
+
+    def put(self, url, kind, headers=None, content_hash="", published="", links=None, changed=True):
+        now = time.time()
+        headers = headers or {}
+        with self._lock:
+            self._db.execute("""INSERT INTO pages VALUES(?,?,?,?,?,?,?,?,?) ON CONFLICT(url) DO UPDATE SET
+                kind=excluded.kind, etag=excluded.etag, last_modified=excluded.last_modified,
+                content_hash=excluded.content_hash, published=excluded.published, links=excluded.links,
+                crawled_at=excluded.crawled_at, changed_at=CASE WHEN ? THEN excluded.changed_at ELSE pages.changed_at END""",
+                (url, kind, headers.get("ETag", ""), headers.get("Last-Modified", ""), content_hash, published,
+                 json.dumps(links, ensure_ascii=False) if links is not None else None, now, now, changed))
+            self._db.commit()
+
+    def touch(self, url):
+        with self._lock:
+            self._db.execute("UPDATE pages SET crawled_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+FRONTIER = Frontier()  # 프로세스 공용
+
+def _validators(known):
+    headers = {}
+    if known and known["etag"]: headers["If-None-Match"] = known["etag"]
+    if known and known["last_modified"]: headers["If-Modified-Since"] = known["last_modified"]
+    return headers
+
+def _get(url, known, timeout):
+    """예의 규칙을 지키며 조건부 GET → (status, html, headers). 304면 html은 None."""
+    with HOST_LIMITER.slot(url):
+        status, body, headers = download(url, timeout=timeout, headers=_validators(known))
+    if status == 304: return status, None, headers
+    return status, (decode_body(body, headers) if 200 <= status < 300 else ""), headers
+
+# --- 목록 페이지 ---
+def parse_list(html: str, page_url: str, rule: dict):
+    """목록 HTML → ([{"title","link"}], 다음 페이지 URL 또는 "")"""
+    soup = BeautifulSoup(html, "html.parser")
+    links, seen = [], set()
+    for sel in rule["items"]:
+        for a in soup.select(sel):
+            title = a.get_text(" ", strip=True)
+            link = urldefrag(urljoin(page_url, a.get("href") or ""))[0]
+            if len(title) < rule["min_title"] or not link.startswith("http") or link in seen or link == page_url: continue
+            if rule["include"] is not None and not rule["include"].search(link): continue
+            seen.add(link); links.append({"title": title, "link": link})
+        if links: break
+    nxt = ""
+    for sel in rule["next"]:
+        a = soup.select_one(sel)
+        if a and a.get("href"):
+            nxt = urldefrag(urljoin(page_url, a["href"]))[0]
+            break
+    return links, nxt
+
+def _list_page(url, rule, timeout, frontier):
+    known = frontier.get(url)
+    if not robots_allowed(url): return [], ""
+    status, html, headers = _get(url, known, timeout)
+    if status == 304 and known and known["links"] is not None:
+        frontier.touch(url)
+        return known["links"]["items"], known["links"]["next"]
+    if not html: return [], ""
+    items, nxt = parse_list(html, url, rule)
+    frontier.put(url, "list", headers, hashlib.sha256(html.encode("utf-8")).hexdigest(), links={"items": items, "next": nxt})
+    return items, nxt
+
+# --- 세부 페이지 ---
+def _visit(item, rule, timeout, deadline, frontier):
+    """세부 페이지 1건: 재방문 주기 안이면 기록만, 아니면 조건부 GET → 게시일 갱신. 반환: 게시일"""
+    url = item["link"]
+    known = frontier.get(url)
+    if known and time.time() - known["crawled_at"] < rule["revisit"]: return known["published"]
+    left = deadline - time.monotonic()
+    if left <= 0.5 or not robots_allowed(url): return known["published"] if known else ""
+    try:
+        status, html, headers = _get(url, known, min(timeout, left))
+    except Exception:
+        return known["published"] if known else ""
+    if status == 304 and known:
+        frontier.touch(url)
+        return known["published"]
+    if not html: return known["published"] if known else ""
+    content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    if known and known["content_hash"] == content_hash:
+        frontier.put(url, "detail", headers, content_hash, known["published"], changed=False)
+        return known["published"]
+    published = extract_published(BeautifulSoup(html, "html.parser")) or (known["published"] if known else "")
+    CONTENT_CACHE.put(url, html, html_to_text(html))  # 요약 단계에서 재다운로드 생략
+    frontier.put(url, "detail", headers, content_hash, published)
+    return published
+
+def crawl_list(url: str, timeout=8, budget=None, frontier=FRONTIER):
+    """
+    목록형 소스 1곳 크롤링 → [{"title","link","pubDate"}] (게시일 내림차순, 날짜 없는 항목은 뒤로)
+    budget(초) 안에 끝내며, 시간이 모자라 못 본 세부 페이지는 다음 실행에서 채운다.
+    """
+    rule = rule_for(url)
+    deadline = time.monotonic() + (budget or timeout)
+    # 1) 목록 페이지: 다음 페이지 링크를 깊이 제한까지 따라감
+    items, seen, page, depth = [], set(), url, 0
+    while page and depth < rule["max_pages"] and time.monotonic() < deadline and page not in seen:
+        seen.add(page); depth += 1
+        try:
+            found, page = _list_page(page, rule, min(timeout, max(0.5, deadline - time.monotonic())), frontier)
+        except Exception:
+            if depth == 1: raise
+            break
+        links = {x["link"] for x in items}
+        items.extend(x for x in found if x["link"] not in links)
+    items = items[:rule["max_items"]]
+    # 2) 세부 페이지: 병렬 방문(호스트별 제한은 HOST_LIMITER가 적용)
+    dates = {}
+    if items:
+        pool = ThreadPoolExecutor(max_workers=min(CRAWL_WORKERS, len(items)), thread_name_prefix="crawl")
+        futs = {pool.submit(_visit, it, rule, timeout, deadline, frontier): it["link"] for it in items}
+        done, _ = wait(futs, timeout=max(0.0, deadline - time.monotonic()))
+        for f in done:
+            try: dates[futs[f]] = f.result()
+            except Exception: pass
+        pool.shutdown(wait=False, cancel_futures=True)
+    out = [{"title": it["title"], "link": it["link"], "pubDate": dates.get(it["link"]) or (frontier.get(it["link"]) or {}).get("published", "")}
+           for it in items]
+    out.sort(key=lambda x: x["pubDate"], reverse=True)
+    return out
@@ -0,0 +1,180 @@
+# fetcher.py
+# 원문 페이지 다운로드 + 텍스트 추출 (app.py, sources.py 공용)
+# - 공용 세션(연결 풀, keep-alive) + 크기 상한 스트리밍 다운로드
+
+import re
+import requests
+import requests.adapters
+from bs4 import BeautifulSoup
+
+from cache import ContentCache
+
+try:
+    import charset_normalizer as _charset_normalizer  # requests 의존성으로 보통 함께 설치됨
+except Exception:
+    _charset_normalizer = None
+
+USER_AGENT = "Hi-PolicyLens/Streamlit"
+
+CONTENT_CACHE = ContentCache()  # 프로세스 공용(모든 세션이 공유)
+
+# --- 공용 HTTP 세션 ---
+# keep-alive로 연결 재사용 + gzip/deflate 압축 수신
+# 호스트별 연결 수는 HOST_CONNECTIONS로 제한(pool_block=True → 초과 요청은 연결이 빌 때까지 대기)
+HOST_CONNECTIONS = 4
+MAX_DOWNLOAD_BYTES = 2 * 1024 * 1024   # 원문 1건 최대 다운로드 크기
+CHUNK_BYTES = 64 * 1024
+SNIFF_BYTES = 16 * 1024                # 인코딩 추정에 쓰는 앞부분 크기
+_CT_CHARSET = re.compile(r"charset=([^\s;]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([a-zA-Z0-9_\-]+)", re.I)
+
+def _make_session():
+    s = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=HOST_CONNECTIONS, pool_block=True)
+    s.mount("http://", adapter); s.mount("https://", adapter)
+    s.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+    return s
+
+SESSION = _make_session()
+
+# --- 텍스트 추출기 ---
+# lxml(C 파서)이 있으면 고속 경로, 없으면 기존 BeautifulSoup(html.parser) 경로
+# 두 경로 모두: 본문 영역(main/article)만 파싱, 잡음 태그 제거, 글자 예산이 차면 중단
+# 파싱 자체도 예산에 비례: 본문 앞부분(글자 예산 × HTML_PER_TEXT)만 먼저 파싱하고, 글자가 모자랄 때만 창을 넓힘
+try:
+    import lxml.html as _lxml_html
+except Exception:
+    _lxml_html = None
+
+TEXT_LIMIT = 24000                # 추출 상한 24000자: normalizer.PROMPT_BUDGET(6000자)의 4배를 모아 budget_text가 선별
+HTML_PER_TEXT = 8                 # 첫 파싱 창 = 글자 예산 × 8 (마크업 포함 원문 길이 추정)
+MAX_HTML_CHARS = 3_000_000        # 이보다 큰 페이지는 앞부분만 파싱
+DROP_TAGS = ("script", "style", "noscript", "nav", "footer", "template", "svg")
+_MAIN_OPEN = re.compile(r"<(main|article)\b", re.I)
+_BODY_OPEN = re.compile(r"<body\b", re.I)
+
+def main_region(html: str) -> str:
+    """본문 영역 문자열만 잘라낸다: 첫 <main>/<article> ~ 마지막 닫는 태그, 없으면 <body> 이후."""
+    html = (html or "")[:MAX_HTML_CHARS]
+    m = _MAIN_OPEN.search(html)
+    if m:
+        tag = m.group(1).lower()
+        end = html.lower().rfind(f"</{tag}>")
+        if end > m.start(): return html[m.start():end + len(tag) + 3]
+    m = _BODY_OPEN.search(html)
+    return html[m.start():] if m else html
+
+def _take(pieces, limit):
+    # 공백 정리하며 이어붙이다가 limit 글자가 차면 중단
+    out, n = [], 0
+    for p in pieces:
+        p = " ".join(p.split())
+        if not p: continue
+        out.append(p); n += len(p) + 1
+        if limit and n >= limit: break
+    text = " ".join(out)
+    return text[:limit] if limit else text
+
+def _clip(html: str, n: int) -> str:
+    # 앞 n글자까지 자르되 태그 중간에서 끊기지 않게 마지막 '<' 앞에서 자름
+    if len(html) <= n: return html
+    cut = html.rfind("<", 0, n)
+    return html[:cut if cut > 0 else n]
+
+def _parse_budgeted(region: str, limit, to_text) -> str:
+    # 창(글자 예산 × HTML_PER_TEXT)만 파싱 → 예산이 안 차고 남은 본문이 있으면 창을 4배로 넓혀 다시
+    if not limit: return to_text(region, limit)
+    n = limit * HTML_PER_TEXT
+    while True:
+        part = _clip(region, n)
+        text = to_text(part, limit)
+        if len(text) >= limit or len(part) >= len(region): return text
+        n *= 4
+
+def _bs4_text(region: str, limit) -> str:
+    soup = BeautifulSoup(region, "html.parser")
+    for t in soup(list(DROP_TAGS)): t.extract()
+    return _take(soup.stripped_strings, limit)
+
+def _lxml_text(region: str, limit) -> str:
+    if not region.strip(): return ""
+    try:
+        root = _lxml_html.fragment_fromstring(region, create_parent="div")
+    except Exception:
+        return _bs4_text(region, limit)  # 인코딩 선언 포함 등 lxml이 거부하는 입력
+    for el in list(root.iter(*DROP_TAGS)): el.drop_tree()
+    for el in root.xpath("//comment()"): el.drop_tree()
+    return _take(root.itertext(), limit)
+
+def _extract_bs4(html: str, limit=TEXT_LIMIT) -> str:
+    return _parse_budgeted(main_region(html), limit, _bs4_text)
+
+def _extract_lxml(html: str, limit=TEXT_LIMIT) -> str:
+    return _parse_budgeted(main_region(html), limit, _lxml_text)
+
+EXTRACTORS = {"bs4": _extract_bs4}
+if _lxml_html is not None: EXTRACTORS["lxml"] = _extract_lxml
+DEFAULT_EXTRACTOR = "lxml" if "lxml" in EXTRACTORS else "bs4"
+
+def html_to_text(html: str, limit=TEXT_LIMIT, extractor=None) -> str:
+    return EXTRACTORS[extractor or DEFAULT_EXTRACTOR](html or "", limit)
+
+def _charset_from_headers(content_type: str) -> str:
+    # requests는 charset 없는 text/*를 ISO-8859-1로 가정하므로 헤더의 charset만 직접 읽는다
+    m = _CT_CHARSET.search(content_type or "")
+    return m.group(1).strip("'\"").lower() if m else ""
+
+def sniff_charset(prefix: bytes) -> str:
+    """앞부분 몇 KB만 보고 인코딩 추정: BOM → <meta charset> → UTF-8 검사 → charset_normalizer"""
+    if prefix.startswith(b"\xef\xbb\xbf"): return "utf-8-sig"
+    m = _META_CHARSET.search(prefix[:SNIFF_BYTES])
+    if m: return m.group(1).decode("ascii", "ignore").lower()
+    try:
+        prefix[:SNIFF_BYTES].decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        if e.start > SNIFF_BYTES - 4: return "utf-8"  # 멀티바이트 문자가 경계에서 잘린 경우
+    if _charset_normalizer is not None:
+        best = _charset_normalizer.from_bytes(prefix[:SNIFF_BYTES]).best()
+        if best: return best.encoding
+    return "utf-8"
+
+def download(url: str, timeout=20, max_bytes=MAX_DOWNLOAD_BYTES, headers=None):
+    """
+    공용 세션으로 스트리밍 다운로드. max_bytes에서 끊는다.
+    반환: (status_code, bytes, response_headers) — 네트워크 오류는 예외로 올림
+    """
+    with SESSION.get(url, timeout=timeout, allow_redirects=True, stream=True, headers=headers) as r:
+        chunks, n = [], 0
+        if 200 <= r.status_code < 300:
+            for chunk in r.iter_content(CHUNK_BYTES):
+                chunks.append(chunk); n += len(chunk)
+                if n >= max_bytes: break
+        return r.status_code, b"".join(chunks)[:max_bytes], r.headers
+
+def fetch_html(url: str, timeout=20, max_bytes=MAX_DOWNLOAD_BYTES) -> str:
+    try:
+        status, body, headers = download(url, timeout=timeout, max_bytes=max_bytes)
+    except: return ""
+    if not (200 <= status < 300): return ""
+    return decode_body(body, headers)
+
+def decode_body(body: bytes, headers) -> str:
+    """응답 바이트 → 문자열 (헤더 charset → 본문 앞부분 추정 순)"""
+    charset = _charset_from_headers(headers.get("Content-Type", "")) or sniff_charset(body)
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def fetch_document(url: str, timeout=20):
+    """원문 HTML + 추출 텍스트. 캐시(메모리 → 디스크)에 있으면 네트워크/파싱 없이 반환."""
+    doc = CONTENT_CACHE.get(url)
+    if doc is not None: return doc["html"], doc["text"]
+    html = fetch_html(url, timeout=timeout)
+    text = html_to_text(html)
+    if html: CONTENT_CACHE.put(url, html, text)  # 실패(빈 응답)는 캐시하지 않음
+    return html, text
+
+def fetch_text(url: str, timeout=20) -> str:
+    return fetch_document(url, timeout=timeout)[1]
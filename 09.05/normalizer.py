@@ -0,0 +1,247 @@
+# normalizer.py
+# 원문 텍스트 → Potens.AI 정규화(JSON 배열)
+# - Streamlit 밖(스레드 풀 워커 등)에서도 호출되므로 st.* UI 호출 없이 순수 함수로 유지
+
+import os, re, time, hashlib
+
+from cache import NormalizeCache
+from potens_client import PotensClient
+from json_stream import StreamingJSONParser
+
+def _get_secret(name, default=None):
+    try:
+        import streamlit as st
+        return st.secrets.get(name, os.getenv(name, default))
+    except Exception:
+        return os.getenv(name, default)
+
+# --- Secrets / ENV ---
+POTENS_API_KEY = _get_secret("POTENS_API_KEY", "PUT_YOUR_POTENS_API_KEY_HERE")
+POTENS_ENDPOINT = _get_secret("POTENS_ENDPOINT", "https://ai.potens.ai/api/chat")
+# 공용 Potens 클라이언트: 연결 풀/keep-alive + 동시 호출 상한(POTENS_MAX_INFLIGHT) + 재시도/서킷 브레이커
+# POTENS_HEDGE=1이면 p95보다 느린 요청에 헤지 요청 추가
+POTENS = PotensClient(hedge=str(_get_secret("POTENS_HEDGE", "0")) == "1")
+POTENS_CALLER = POTENS.caller  # 호출 통계(stats_text)용
+
+# --- 원문 예산: 규제 신호가 많은 문단을 우선 담기 ---
+PROMPT_BUDGET = 6000
+PASSAGE_CHARS = 500
+SECTOR_KEYWORDS = {   # app.py의 SECTORS와 같은 키
+    "solar":   ["solar", "photovoltaic", "태양광", "태양에너지"],
+    "wind":    ["wind", "offshore", "turbine", "풍력"],
+    "hydro":   ["hydro", "hydropower", "수력", "양수"],
+    "nuclear": ["nuclear", "reactor", "원자력", "원전"],
+}
+POLICY_KEYWORDS = ["renewable", "재생에너지", "신재생", "rps", "rec", "feed-in", "tariff", "subsidy", "tax credit",
+                   "보조금", "세액공제", "regulation", "directive", "고시", "시행령", "개정", "effective", "시행"]
+_SENT_SPLIT = re.compile(r"(?<=[.!?。])\s+")
+_SIGNALS = [
+    (3.0, re.compile(r"\b(19|20)\d{2}[-./](0?[1-9]|1[0-2])([-./]\d{1,2})?\b|(19|20)\d{2}\s*년|\d{1,2}\s*월\s*\d{1,2}\s*일|"
+                     r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2},?\s+(19|20)\d{2}", re.I)),
+    (3.0, re.compile(r"\b(shall|must|required|prohibited|mandatory|obligat\w*|comply|compliance|penalt\w*)\b|"
+                     r"해야|하여야|의무|금지|준수|제재|과태료|벌금", re.I)),
+    (2.0, re.compile(r"[$€£₩]\s?\d|\d[\d,.]*\s?(%|percent|million|billion|usd|eur|krw|원|억|만원|mw|gw|kwh)", re.I)),
+]
+_KEYWORDS = [(2.0, re.compile("|".join(re.escape(k) for ks in SECTOR_KEYWORDS.values() for k in ks), re.I)),
+             (1.0, re.compile("|".join(re.escape(k) for k in POLICY_KEYWORDS), re.I))]
+
+def split_passages(text: str, size=PASSAGE_CHARS):
+    """문장 단위로 쪼갠 뒤 size 글자 안팎의 문단으로 다시 묶는다"""
+    out, buf = [], ""
+    for s in _SENT_SPLIT.split(text or ""):
+        s = (s or "").strip()
+        if not s: continue
+        while len(s) > size:  # 문장부호 없는 긴 덩어리
+            if buf: out.append(buf); buf = ""
+            out.append(s[:size]); s = s[size:]
+        if buf and len(buf) + len(s) + 1 > size:
+            out.append(buf); buf = ""
+        buf = f"{buf} {s}" if buf else s
+    if buf: out.append(buf)
+    return out
+
+def score_passage(p: str) -> float:
+    score = 0.0
+    for w, rx in _SIGNALS + _KEYWORDS:
+        score += w * min(len(rx.findall(p)), 3)  # 같은 신호 반복은 3회까지만
+    return score
+
+def budget_text(text: str, budget=PROMPT_BUDGET) -> str:
+    """
+    원문이 예산보다 길면 규제 신호(날짜, shall/must, 금액, 섹터 키워드) 점수가 높은 문단부터 담는다.
+    - 첫 문단(제목/리드)은 항상 포함, 신호가 없는 문단은 제외 → 프롬프트도 작아짐
+    - 담긴 문단은 원래 순서대로, 떨어진 문단 사이는 " … "로 연결
+    """
+    text = text or ""
+    if len(text) <= budget: return text
+    passages = split_passages(text)
+    scores = [score_passage(p) for p in passages]
+    ranked = sorted(range(1, len(passages)), key=lambda i: -scores[i])
+    picked, used = {0}, len(passages[0]) if passages else 0
+    for i in ranked:
+        if scores[i] <= 0: break
+        if used + len(passages[i]) + 3 > budget: continue
+        picked.add(i); used += len(passages[i]) + 3
+    if len(picked) == 1: return text[:budget]  # 신호가 전혀 없으면 예전처럼 앞부분
+    out, prev = [], None
+    for i in sorted(picked):
+        if prev is not None: out.append(" " if i == prev + 1 else " … ")
+        out.append(passages[i]); prev = i
+    return "".join(out)[:budget]
+
+def build_prompt(text: str, origin: str) -> str:
+    clipped = (text or "")[:PROMPT_BUDGET]
+    return f"""역할: 국제 규제 분석가
+목표: 아래 원문에서 "신재생에너지 관련 규제"만 추출하여 JSON 배열로 정규화.
+
+스키마:
+[
+  {{
+    "jurisdiction": "국가/기관/지역",
+    "law_or_policy": "법/정책/지침 명",
+    "effective_date": "YYYY-MM-DD 또는 미상",
+    "requirements": ["핵심 요건1","핵심 요건2"],
+    "reporting": "보고/신고 주기 또는 방식(미상이면 'N/A')",
+    "incentives": ["세제/보조 등"],
+    "penalties": ["미이행시 제재"],
+    "source": "원문 URL"
+  }}
+]
+
+[원문 출처] {origin}
+[원문]
+{clipped}
+
+반드시 **순수한 유효 JSON 배열([])**만 출력하세요.
+- 마크다운/설명/코드펜스/주석/텍스트 금지
+- JSON 외 문자를 포함하지 말 것
+- 불확실하면 빈 배열([]) 반환"""
+
+def build_batch_prompt(docs) -> str:
+    """docs: [(doc_id, text, origin)] — 짧은 문서 여러 개를 한 번에 정규화"""
+    blocks = "\n\n".join(f"[문서 {doc_id}] 출처: {origin}\n{text}" for doc_id, text, origin in docs)
+    return f"""역할: 국제 규제 분석가
+목표: 아래 문서들 각각에서 "신재생에너지 관련 규제"만 추출하여 문서 ID별 JSON 배열로 정규화.
+
+스키마(문서 ID → 배열):
+{{
+  "<문서 ID>": [
+    {{
+      "jurisdiction": "국가/기관/지역",
+      "law_or_policy": "법/정책/지침 명",
+      "effective_date": "YYYY-MM-DD 또는 미상",
+      "requirements": ["핵심 요건1","핵심 요건2"],
+      "reporting": "보고/신고 주기 또는 방식(미상이면 'N/A')",
+      "incentives": ["세제/보조 등"],
+      "penalties": ["미이행시 제재"],
+      "source": "원문 URL"
+    }}
+  ]
+}}
+
+{blocks}
+
+반드시 **순수한 유효 JSON 객체({{}})**만 출력하세요.
+- 모든 문서 ID를 키로 포함하고, 해당 없는 문서는 빈 배열([])
+- 마크다운/설명/코드펜스/주석/텍스트 금지
+- JSON 외 문자를 포함하지 말 것"""
+
+# 프롬프트 템플릿이 바뀌면 버전(해시)이 바뀌어 기존 캐시는 자동으로 무효 (단건/배치 템플릿 모두 반영)
+PROMPT_VERSION = hashlib.sha256((build_prompt("{text}", "{origin}") +
+                                 build_batch_prompt([("{id}", "{text}", "{origin}")])).encode("utf-8")).hexdigest()[:12]
+NORM_CACHE = NormalizeCache()  # 프로세스 공용(모든 세션/재실행이 공유)
+
+def norm_key(text: str, origin_url: str) -> str:
+    clipped = (text or "")[:PROMPT_BUDGET]
+    return hashlib.sha256("\0".join([PROMPT_VERSION, clipped, origin_url or ""]).encode("utf-8")).hexdigest()
+
+def is_normalized(text: str, origin_url: str) -> bool:
+    """이 원문에 대한 정상 응답이 캐시에 있는가 (빈 배열 응답 포함, 호출 실패는 제외)"""
+    return NORM_CACHE.has(norm_key(text, origin_url))
+
+def _normalize_item(it: dict, origin_url: str) -> dict:
+    return {
+        "jurisdiction": it.get("jurisdiction",""),
+        "law_or_policy": it.get("law_or_policy",""),
+        "effective_date": it.get("effective_date","N/A"),
+        "requirements": it.get("requirements",[]) if isinstance(it.get("requirements",[]),list) else [],
+        "reporting": it.get("reporting","N/A"),
+        "incentives": it.get("incentives",[]) if isinstance(it.get("incentives",[]),list) else [],
+        "penalties": it.get("penalties",[]) if isinstance(it.get("penalties",[]),list) else [],
+        "source": it.get("source", origin_url)
+    }
+
+def has_api_key() -> bool:
+    return bool(POTENS_API_KEY) and not POTENS_API_KEY.startswith("PUT_")
+
+def _post_potens(prompt: str, limiter=None):
+    """
+    Potens 호출 → 응답 본문 문자열. 일시 오류(429/5xx/네트워크)는 POTENS 클라이언트가 백오프 재시도.
+    재시도 후에도 실패하거나 브레이커가 열려 있으면 None (호출 측은 캐시/증분 기록을 남기지 않음).
+    """
+    res = POTENS.call(POTENS_ENDPOINT, prompt, api_key=POTENS_API_KEY, headers={"Accept": "application/json"},
+                      timeout=40, before_attempt=limiter.acquire if limiter is not None else None)
+    return res["text"] if res["ok"] else None
+
+def normalize_with_ai(text: str, origin_url: str, limiter=None):
+    """
+    원문 → 정규화 아이템 리스트. 같은 (프롬프트 버전, 원문, URL)은 캐시에서 바로 반환.
+    limiter: 실제 API 호출 직전에만 acquire() (캐시 적중 시 호출률 소모 없음)
+    """
+    if not has_api_key() or not (text or "").strip():  # 키 미설정/빈 본문이면 호출하지 않음
+        return []
+    key = norm_key(text, origin_url)
+    hit = NORM_CACHE.get(key)
+    if hit is not None: return hit["items"]
+    t0 = time.monotonic()
+    body = _post_potens(build_prompt(text, origin_url), limiter)
+    # 원소가 닫히는 대로 바로 정규화 — 잘린 응답이어도 앞쪽 완성된 항목은 살린다
+    parser, out = StreamingJSONParser(expect="["), []
+    for ev in parser.feed(body or ""):
+        if ev[0] == "item" and isinstance(ev[3], dict):
+            out.append(_normalize_item(ev[3], origin_url))
+    # 호출 실패/파싱 실패/잘린 응답은 캐시하지 않음 (다음 실행에서 재시도)
+    if not parser.done: return out
+    NORM_CACHE.put(key, out, prompt_version=PROMPT_VERSION, origin=origin_url,
+                   elapsed=time.monotonic() - t0)
+    return out
+
+def normalize_batch(docs, limiter=None):
+    """
+    짧은 문서 여러 개를 한 번의 Potens 호출로 정규화.
+    docs: [(text, origin_url)] → 같은 순서의 아이템 리스트들
+    캐시 적중 문서는 프롬프트에서 빼고, 배치 응답에서 빠졌거나 잘린 문서만 단건 호출로 폴백.
+    배치 호출 자체가 실패하면(타임아웃/재시도 후 5xx/브레이커 차단) 폴백 없이 빈 결과 — 장애 중 호출 1건이 N건으로 불어나지 않게.
+    """
+    if not has_api_key(): return [[] for _ in docs]
+    results, todo = [None] * len(docs), []
+    for i, (text, origin) in enumerate(docs):
+        if not (text or "").strip():
+            results[i] = []
+            continue
+        hit = NORM_CACHE.get(norm_key(text, origin))
+        if hit is not None: results[i] = hit["items"]
+        else: todo.append(i)
+    if len(todo) > 1:
+        t0 = time.monotonic()
+        parser = StreamingJSONParser(expect="{")
+        body = _post_potens(
+            build_batch_prompt([(str(i), docs[i][0][:PROMPT_BUDGET], docs[i][1]) for i in todo]), limiter)
+        # 문서 배열이 하나씩 닫히는 대로 수집. 잘린 응답이면 마지막(미완) 문서는 단건 폴백으로 넘어감
+        obj = {ev[1]: ev[2] for ev in parser.feed(body) if ev[0] == "field"} if body is not None else {}
+        per_doc = (time.monotonic() - t0) / len(todo)
+        for i in todo:
+            if body is None:
+                results[i] = []  # 캐시하지 않음 → 다음 실행에서 재시도
+                continue
+            arr = obj.get(str(i))
+            if not isinstance(arr, list): continue
+            text, origin = docs[i]
+            results[i] = [_normalize_item(it, origin) for it in arr if isinstance(it, dict)]
+            NORM_CACHE.put(norm_key(text, origin), results[i], prompt_version=PROMPT_VERSION,
+                           origin=origin, elapsed=per_doc)
+    # 폴백: 단건 호출
+    for i in range(len(docs)):
+        if results[i] is None:
+            results[i] = normalize_with_ai(docs[i][0], docs[i][1], limiter=limiter)
+    return results
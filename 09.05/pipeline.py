@@ -0,0 +1,181 @@
+# pipeline.py
+# "모두 요약" 병렬 엔진
+# - 원문 다운로드/추출 풀과 Potens 정규화 풀을 따로 둬서, 준비된 문서는 남은 다운로드를 기다리지 않고 바로 정규화
+# - Potens 호출은 토큰 버킷으로 초당 호출 수를 제한 (고정 sleep 대신)
+# - 문서 하나가 끝날 때마다 결과를 바로 돌려줌(제너레이터) → UI가 스트리밍으로 누적/진행률 표시
+# - 증분 모드: 이전 실행에서 처리한 문서 중 바뀌지 않은 것은 저장된 결과를 재사용
+# - 짧은 문서(RSS 공지 등)는 여러 건을 한 번의 Potens 호출로 묶어 왕복 횟수를 줄임
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from fetcher import fetch_text
+from normalizer import normalize_with_ai, normalize_batch, is_normalized, budget_text, PROMPT_BUDGET, _get_secret
+from cache import IngestIndex
+from search import SEARCH_INDEX
+
+SUMMARY_WORKERS = int(_get_secret("POLICYLENS_WORKERS", "4"))      # 동시 처리 문서 수
+POTENS_RATE = float(_get_secret("POTENS_RATE_PER_SEC", "2"))      # Potens 초당 호출 수
+POTENS_BURST = int(_get_secret("POTENS_BURST", "2"))              # 순간 허용 호출 수
+SHORT_DOC_CHARS = 1500        # 이보다 짧은 문서는 여러 개를 한 번의 Potens 호출로 묶음
+BATCH_MAX_DOCS = 6
+BATCH_BUDGET = PROMPT_BUDGET  # 배치 1건에 담는 원문 총 글자 수
+BATCH_MAX_WAIT = 0.5          # 초. 덜 찬 배치도 첫 문서가 들어온 뒤 이만큼 지나면 보냄
+
+class TokenBucket:
+    """rate개/초로 토큰이 차고 최대 capacity개까지 쌓이는 버킷. acquire()는 토큰이 생길 때까지 대기."""
+    def __init__(self, rate=POTENS_RATE, capacity=POTENS_BURST):
+        self.rate, self.capacity = rate, capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+POTENS_BUCKET = TokenBucket()  # 프로세스 공용: 여러 세션이 동시에 돌려도 합산 호출률 제한
+INGEST_INDEX = IngestIndex()
+
+def fallback_item(row: dict) -> dict:
+    # 정규화 없는 경우 폴백으로 제목 기반 최소 항목
+    return {
+        "jurisdiction":"", "law_or_policy": row["title"], "effective_date":"N/A",
+        "requirements":[], "reporting":"N/A", "incentives":[], "penalties":[], "source": row["link"]
+    }
+
+def attach_row(row: dict, items):
+    return [{ **it, "region": row["region"], "link": row["link"], "title": row["title"] } for it in items]
+
+def prepare_row(row: dict, incremental=True, index=INGEST_INDEX) -> dict:
+    """
+    1단계(다운로드/추출/예산): 목록 한 줄 → 작업 dict {"row","status","text","hash","items"}
+    상태: "new" | "changed" | "unchanged"(원문 해시 동일) | "skipped"(목록 지문 동일 → 다운로드도 생략)
+    정규화가 필요 없으면 items에 저장된 결과가 채워져 있다.
+    """
+    seen = index.lookup(row["link"])
+    # 1) 제목+게시일이 같은 이미 처리한 항목은 원문도 받지 않는다 (게시일 없는 목록형 소스는 원문 해시로 판단)
+    if incremental and seen and row.get("pubDate") and seen["fingerprint"] == index.fingerprint(row):
+        index.touch(row["link"])
+        return {"row": row, "status": "skipped", "items": seen["items"]}
+    text = fetch_text(row["link"])
+    if not text:
+        # 다운로드/추출 실패: 빈 본문은 정규화하지도 기록하지도 않는다 (저장된 결과 유지, 다음 실행에서 재시도)
+        if seen: return {"row": row, "status": "unchanged", "items": seen["items"]}
+        return {"row": row, "status": "new", "items": []}
+    content_hash = index.content_hash(text)
+    # 2) 원문이 그대로면 정규화 생략
+    if incremental and seen and seen["content_hash"] == content_hash:
+        index.record(row, content_hash, seen["items"])
+        return {"row": row, "status": "unchanged", "items": seen["items"]}
+    if text: SEARCH_INDEX.add_body(row, text)  # 키워드 색인에 본문 반영
+    clipped = budget_text(text)
+    return {"row": row, "status": "changed" if seen else "new", "text": clipped, "hash": content_hash,
+            "items": None, "cached": is_normalized(clipped, row["link"])}
+
+def finish_row(job: dict, items=None, index=INGEST_INDEX):
+    """3단계: 인덱스 기록 + 행 정보 부착 → (아이템 리스트, 상태)"""
+    row = job["row"]
+    if job["items"] is None:
+        # 정상 응답일 때만 기록 (키 미설정/호출 실패는 다음 실행에서 다시 시도)
+        if is_normalized(job["text"], row["link"]):
+            index.record(row, job["hash"], items)
+    else:
+        items = job["items"]
+    return attach_row(row, items or [fallback_item(row)]), job["status"]
+
+def normalize_jobs(jobs, bucket=POTENS_BUCKET):
+    """2단계(Potens): 작업 1건은 단건 호출, 여러 건은 배치 호출 → [(job, items)]"""
+    if len(jobs) == 1:
+        job = jobs[0]
+        return [(job, normalize_with_ai(job["text"], job["row"]["link"], limiter=bucket))]
+    results = normalize_batch([(job["text"], job["row"]["link"]) for job in jobs], limiter=bucket)
+    return list(zip(jobs, results))
+
+def ingest_row(row: dict, bucket=POTENS_BUCKET, incremental=True):
+    job = prepare_row(row, incremental)
+    if job["items"] is not None: return finish_row(job)
+    return finish_row(*normalize_jobs([job], bucket)[0])
+
+def summarize_row(row: dict, bucket=POTENS_BUCKET):
+    """목록 한 줄 → 정규화 아이템 리스트 (region/link/title 포함). 개별 요약 버튼은 항상 다시 처리."""
+    return ingest_row(row, bucket, incremental=False)[0]
+
+def summarize_all(rows, workers=SUMMARY_WORKERS, bucket=POTENS_BUCKET, incremental=False, batch=True):
+    """
+    rows를 병렬로 요약하며, 끝나는 순서대로 (index, items, progress)를 yield.
+    - 다운로드/추출(1단계)과 Potens 호출(2단계)은 각자의 풀에서 돌아 서로의 대기열에 막히지 않음
+    - batch=True면 SHORT_DOC_CHARS 이하 문서를 BATCH_MAX_DOCS개/BATCH_BUDGET 글자까지 묶어 한 번에 호출
+      (덜 찬 배치는 BATCH_MAX_WAIT초가 지나거나 1단계가 모두 끝나면 보냄)
+    progress: {"done","total","elapsed","rate"(문서/초),"eta"(초),"calls","new","changed","unchanged","skipped"}
+    """
+    total = len(rows)
+    if not total: return
+    t0 = time.monotonic()
+    counts = {"new": 0, "changed": 0, "unchanged": 0, "skipped": 0}
+    stats = {"done": 0, "calls": 0}
+
+    def emit(i, items, status):
+        counts[status] += 1
+        stats["done"] += 1
+        elapsed = time.monotonic() - t0
+        rate = stats["done"] / elapsed if elapsed > 0 else 0.0
+        eta = (total - stats["done"]) / rate if rate > 0 else 0.0
+        return i, items, {"total": total, "elapsed": elapsed, "rate": rate, "eta": eta, **stats, **counts}
+
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as fetch_pool, \
+         ThreadPoolExecutor(max_workers=workers, thread_name_prefix="normalize") as norm_pool:
+        pending = {fetch_pool.submit(prepare_row, r, incremental): ("prep", i) for i, r in enumerate(rows)}
+        buf, buf_chars, buf_since, preps_left = [], 0, 0.0, total
+
+        def submit(jobs):
+            if not all(job.get("cached") for job in jobs): stats["calls"] += 1
+            pending[norm_pool.submit(normalize_jobs, jobs, bucket)] = ("norm", jobs)
+
+        while pending or buf:
+            timeout = max(0.0, buf_since + BATCH_MAX_WAIT - time.monotonic()) if buf else None
+            done = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)[0] if pending else ()
+            for f in done:
+                kind, ref = pending.pop(f)
+                if kind == "prep":
+                    preps_left -= 1
+                    try:
+                        job = f.result()
+                    except Exception:
+                        job = {"row": rows[ref], "status": "new", "items": []}
+                    job["i"] = ref
+                    if job["items"] is not None:
+                        yield emit(ref, *finish_row(job))
+                    elif batch and not job["cached"] and len(job["text"]) <= SHORT_DOC_CHARS:
+                        if buf and (len(buf) >= BATCH_MAX_DOCS or buf_chars + len(job["text"]) > BATCH_BUDGET):
+                            submit(buf); buf, buf_chars = [], 0
+                        if not buf: buf_since = time.monotonic()
+                        buf.append(job); buf_chars += len(job["text"])
+                    else:
+                        submit([job])
+                else:
+                    try:
+                        results = f.result()
+                    except Exception:
+                        results = [(job, []) for job in ref]
+                    for job, items in results:
+                        yield emit(job["i"], *finish_row(job, items))
+            # 덜 찬 배치: 1단계가 모두 끝났거나 오래 기다렸으면 보낸다
+            if buf and (not preps_left or time.monotonic() - buf_since >= BATCH_MAX_WAIT):
+                submit(buf); buf, buf_chars = [], 0
+
+def progress_text(p: dict) -> str:
+    return f"모두 요약 중… {p['done']}/{p['total']} · {p['rate']*60:.1f}건/분 · 남은 시간 약 {p['eta']:.0f}초 · Potens 호출 {p['calls']}회"
+
+def ingest_summary(p: dict) -> str:
+    return f"신규 {p['new']} · 변경 {p['changed']} · 건너뜀 {p['unchanged'] + p['skipped']} (원문 재다운로드 생략 {p['skipped']})"
@@ -0,0 +1,153 @@
+# snapshots.py
+# 정규화 결과 스냅샷 저장소 + 변화 리포트(diff) 엔진
+# - 실행 결과(normalized_rows)를 버전별 스냅샷으로 영속 저장 (SQLite: <DATA_DIR>/snapshots.sqlite3)
+# - 레코드 본문은 내용 해시로 한 번만 저장, 스냅샷은 (key → 해시) 목록만 가짐
+# - 필드별 해시를 미리 계산해 두고, 두 스냅샷 diff는 SQL에서 해시 비교로 1회 계산 후 캐시
+# - 스냅샷은 일괄 실행("모두 요약", 배치 실행)만 남김 — 개별 요약 클릭마다 저장하면 비교 목록이 잡음으로 채워짐
+# - 배치 실행(batch.py) 결과는 BATCH_LABEL로 저장되고, 앱은 첫 화면에서 최신 배치 결과를 읽음
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from cache import DATA_DIR
+
+DIFF_MEM_ITEMS = 16
+BATCH_LABEL = "배치 실행"
+DIFF_FIELDS = ["effective_date","reporting","requirements","incentives","penalties","law_or_policy"]
+
+def key_of(item: dict) -> str:
+    return f"{item.get('jurisdiction','')}|{item.get('law_or_policy','')}"
+
+def _hash(v) -> str:
+    return hashlib.sha1(json.dumps(v, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def field_hashes(item: dict) -> dict:
+    return {f: _hash(item.get(f, "")) for f in DIFF_FIELDS}
+
+class SnapshotStore:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, "snapshots.sqlite3")
+        self._lock = threading.Lock()
+        self._diffs = OrderedDict()  # (a, b) → diff 결과 (메모리 LRU, 디스크 diffs 테이블 앞단)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshots(
+                id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL, label TEXT, size INTEGER, digest TEXT, meta TEXT);
+            CREATE TABLE IF NOT EXISTS bodies(hash TEXT PRIMARY KEY, fields TEXT, data TEXT);
+            CREATE TABLE IF NOT EXISTS members(snapshot_id INTEGER, key TEXT, hash TEXT, pos INTEGER,
+                PRIMARY KEY(snapshot_id, key)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS diffs(a INTEGER, b INTEGER, result TEXT, PRIMARY KEY(a, b));
+        """)
+        self._db.commit()
+
+    def save(self, rows, label="", meta=None) -> int:
+        """
+        rows를 새 스냅샷으로 저장하고 id 반환. 직전 스냅샷과 내용·라벨이 같으면 새로 만들지 않는다.
+        meta: 함께 보관할 부가 정보(dict) — 배치 실행의 목록/소요 시간 등
+        """
+        members = {}
+        for it in rows:  # 같은 키는 나중 것이 우선 (기존 to_map과 동일)
+            members[key_of(it)] = it
+        bodies = {}
+        for k, it in members.items():
+            fh = field_hashes(it)
+            h = _hash([fh, it])
+            bodies[h] = (fh, it)
+            members[k] = h
+        digest = _hash(sorted(members.items()))
+        with self._lock:
+            last = self._db.execute("SELECT id, digest, label FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+            if last and last[1] == digest and last[2] == label:
+                if meta is not None:
+                    self._db.execute("UPDATE snapshots SET meta = ? WHERE id = ?", (json.dumps(meta, ensure_ascii=False), last[0]))
+                    self._db.commit()
+                return last[0]
+            cur = self._db.execute("INSERT INTO snapshots(created_at, label, size, digest, meta) VALUES(?,?,?,?,?)",
+                                   (time.time(), label, len(members), digest, json.dumps(meta or {}, ensure_ascii=False)))
+            sid = cur.lastrowid
+            self._db.executemany("INSERT OR IGNORE INTO bodies VALUES(?,?,?)",
+                                 [(h, json.dumps(fh), json.dumps(it, ensure_ascii=False)) for h, (fh, it) in bodies.items()])
+            self._db.executemany("INSERT INTO members VALUES(?,?,?,?)",
+                                 [(sid, k, h, pos) for pos, (k, h) in enumerate(members.items())])
+            self._db.commit()
+        return sid
+
+    def list(self, limit=None, label=None):
+        """스냅샷 목록(최신순). label로 종류를 거르고, limit이 없으면 전부 (메타데이터만 읽으므로 가볍다)"""
+        sql, args = "SELECT id, created_at, label, size FROM snapshots", ()
+        if label: sql, args = sql + " WHERE label = ?", (label,)
+        sql += " ORDER BY id DESC"
+        if limit: sql, args = sql + " LIMIT ?", args + (limit,)
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [{"id": r[0], "created_at": r[1], "label": r[2], "size": r[3]} for r in rows]
+
+    def labels(self):
+        """[(라벨, 스냅샷 수)] — 최근에 쓰인 라벨부터"""
+        with self._lock:
+            return self._db.execute("SELECT label, COUNT(*) FROM snapshots GROUP BY label ORDER BY MAX(id) DESC").fetchall()
+
+    def latest(self, label=None):
+        """가장 최근 스냅샷(label 지정 시 해당 라벨 중) → {"id","created_at","label","size","meta"} 또는 None"""
+        with self._lock:
+            row = self._db.execute("SELECT id, created_at, label, size, meta FROM snapshots"
+                                   + (" WHERE label = ?" if label else "") + " ORDER BY id DESC LIMIT 1",
+                                   (label,) if label else ()).fetchone()
+        if not row: return None
+        return {"id": row[0], "created_at": row[1], "label": row[2], "size": row[3], "meta": json.loads(row[4] or "{}")}
+
+    def load(self, sid):
+        with self._lock:
+            rows = self._db.execute("""SELECT b.data FROM members m JOIN bodies b ON b.hash = m.hash
+                                       WHERE m.snapshot_id = ? ORDER BY m.pos""", (sid,)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def diff(self, a, b):
+        """
+        스냅샷 a(이전) → b(이후) 변화: {"added":[], "removed":[], "updated":[{"after","before","changes"}]}
+        해시가 같은 레코드는 본문을 읽지 않는다. 결과는 diffs 테이블에 캐시.
+        """
+        with self._lock:
+            if (a, b) in self._diffs:
+                self._diffs.move_to_end((a, b))
+                return self._diffs[(a, b)]
+            row = self._db.execute("SELECT result FROM diffs WHERE a=? AND b=?", (a, b)).fetchone()
+            if row: return self._remember(a, b, json.loads(row[0]))
+            q = self._db.execute
+            added = [json.loads(r[0]) for r in q("""
+                SELECT bb.data FROM members mb JOIN bodies bb ON bb.hash = mb.hash
+                LEFT JOIN members ma ON ma.snapshot_id = ? AND ma.key = mb.key
+                WHERE mb.snapshot_id = ? AND ma.key IS NULL ORDER BY mb.key""", (a, b))]
+            removed = [json.loads(r[0]) for r in q("""
+                SELECT ba.data FROM members ma JOIN bodies ba ON ba.hash = ma.hash
+                LEFT JOIN members mb ON mb.snapshot_id = ? AND mb.key = ma.key
+                WHERE ma.snapshot_id = ? AND mb.key IS NULL ORDER BY ma.key""", (b, a))]
+            updated = []
+            for fa, da, fb, db in q("""
+                SELECT ba.fields, ba.data, bb.fields, bb.data
+                FROM members ma JOIN members mb ON mb.key = ma.key AND mb.snapshot_id = ?
+                JOIN bodies ba ON ba.hash = ma.hash JOIN bodies bb ON bb.hash = mb.hash
+                WHERE ma.snapshot_id = ? AND ma.hash != mb.hash ORDER BY ma.key""", (b, a)):
+                fa, fb = json.loads(fa), json.loads(fb)
+                changed = [f for f in DIFF_FIELDS if fa.get(f) != fb.get(f)]
+                if not changed: continue  # 비교 대상 외 필드(region/link 등)만 바뀐 경우
+                before, after = json.loads(da), json.loads(db)
+                updated.append({"after": after, "before": before,
+                                "changes": [{"field": f, "before": before.get(f, ""), "after": after.get(f, "")} for f in changed]})
+            result = {"added": added, "removed": removed, "updated": updated}
+            self._db.execute("INSERT OR REPLACE INTO diffs VALUES(?,?,?)", (a, b, json.dumps(result, ensure_ascii=False)))
+            self._db.commit()
+            return self._remember(a, b, result)
+
+    def _remember(self, a, b, result):
+        self._diffs[(a, b)] = result
+        while len(self._diffs) > DIFF_MEM_ITEMS: self._diffs.popitem(last=False)
+        return result
+
+SNAPSHOTS = SnapshotStore()  # 프로세스 공용
@@ -0,0 +1,137 @@
+# sources.py
+# 공공기관 소스 수집 엔진
+# - RSS / HTML 목록 소스를 스레드 풀에서 동시에 가져옴
+# - 소스별 타임아웃 + 전체 마감시간(deadline): 느린 기관 하나가 "검색(빠름)"을 붙잡지 않도록
+#   마감까지 끝난 소스만 부분 결과로 돌려주고, 소스별 상태(ok/error/timeout)를 함께 반환
+# - HTML 목록 소스는 crawler.py(소스별 셀렉터 + 페이지 깊이 제한 + 증분 방문)로 수집
+
+import time
+import requests
+import feedparser
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+from fetcher import html_to_text, SESSION
+from crawler import crawl_list
+from cache import FeedCache
+
+SOURCE_TIMEOUT = 8     # 소스 1곳당 네트워크 타임아웃(초)
+COLLECT_DEADLINE = 15  # 전체 수집 마감(초) — 이 시간이 지나면 끝난 소스만 사용
+FEED_SUMMARY_CHARS = 1000  # 피드 항목 요약(description) 보관 글자 수 — 키워드 색인용
+
+FEED_CACHE = FeedCache()  # 프로세스 공용(모든 세션이 공유)
+
+# 공공기관 3곳 소스 정의 (앱과 배치 실행이 같이 사용)
+SOURCES = [
+    # 1) MOTIE 보도자료 RSS
+    {"type":"rss", "url":"https://www.motie.go.kr/rss/rssView.do?bbs_cd_n=81"},
+    # 2) CBP 무역 공지 RSS
+    {"type":"rss", "url":"https://www.cbp.gov/rss/trade.xml"},
+    # 3) ECHA Legislation (HTML 목록 파싱)
+    {"type":"html", "url":"https://echa.europa.eu/legislation"}
+]
+
+def region_from_url(url: str) -> str:
+    try:
+        host = urlparse(url).hostname or ""
+        if host.endswith("cbp.gov"): return "북미"
+        if host.endswith("motie.go.kr"): return "아시아"
+        if host.endswith("europa.eu"): return "유럽"
+    except: pass
+    return ""
+
+def _parse_feed(url: str, content: bytes, headers=None):
+    feed = feedparser.parse(content, response_headers={k.lower(): v for k, v in (headers or {}).items()})
+    out = []
+    for e in getattr(feed, "entries", []) or []:
+        if not getattr(e,"title",None) or not getattr(e,"link",None): continue
+        out.append({
+            "title": e.title,
+            "link": e.link,
+            "pubDate": getattr(e,"published","") or getattr(e,"updated",""),
+            "summary": html_to_text(getattr(e,"summary","") or "", limit=FEED_SUMMARY_CHARS),
+            "source": url,
+            "region": region_from_url(e.link)
+        })
+    return out
+
+def fetch_from_rss(url: str, timeout=SOURCE_TIMEOUT):
+    # 1) TTL 이내 캐시면 네트워크 없이 반환
+    cached = FEED_CACHE.get(url)
+    if FEED_CACHE.is_fresh(cached):
+        FEED_CACHE.count("fresh")
+        return cached["entries"]
+    # 2) feedparser.parse(url)는 자체 다운로드에 타임아웃이 없으므로 requests로 받은 뒤 파싱만 맡긴다
+    #    캐시가 있으면 ETag/Last-Modified로 조건부 GET
+    headers = FEED_CACHE.validators(cached)
+    try:
+        r = SESSION.get(url, timeout=timeout, allow_redirects=True, headers=headers)
+    except requests.RequestException:
+        if not cached: raise
+        FEED_CACHE.count("stale")  # 네트워크 실패 시 오래된 캐시라도 반환
+        return cached["entries"]
+    if r.status_code == 304 and cached:
+        FEED_CACHE.count("revalidated")
+        return FEED_CACHE.touch(url, cached)["entries"]
+    r.raise_for_status()
+    out = _parse_feed(url, r.content, r.headers)
+    FEED_CACHE.count("miss")
+    FEED_CACHE.put(url, out, etag=r.headers.get("ETag", ""),
+                   last_modified=r.headers.get("Last-Modified", ""), body=r.content)
+    return out
+
+def fetch_from_html_list(url: str, timeout=SOURCE_TIMEOUT):
+    """HTML 목록형 소스(ECHA 법령 페이지 등): 증분 크롤러로 목록 → 세부 페이지 게시일까지 수집."""
+    return [{**x, "source": url, "region": region_from_url(x["link"])} for x in crawl_list(url, timeout=timeout)]
+
+FETCHERS = {
+    "rss": fetch_from_rss,
+    "html": fetch_from_html_list,
+}
+
+def _fetch_source(src: dict, timeout):
+    t0 = time.monotonic()
+    items = FETCHERS[src["type"]](src["url"], timeout=timeout)
+    return items, time.monotonic() - t0
+
+def collect_sources(sources, timeout=SOURCE_TIMEOUT, deadline=COLLECT_DEADLINE, max_workers=None):
+    """
+    모든 소스를 병렬로 수집한다.
+    반환: (entries, statuses)
+      - entries: 마감 전에 끝난 소스들의 항목을 합친 리스트
+      - statuses: 소스별 {"type","url","status","count","elapsed","error"}
+        status는 "ok" | "error" | "timeout"
+    마감을 넘긴 소스는 기다리지 않는다(백그라운드 스레드는 자체 타임아웃으로 곧 종료).
+    """
+    entries, statuses = [], []
+    if not sources: return entries, statuses
+    t0 = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(sources), thread_name_prefix="source")
+    futs = {pool.submit(_fetch_source, src, timeout): src for src in sources}
+    pending = set(futs)
+    try:
+        while pending:
+            left = deadline - (time.monotonic() - t0)
+            if left <= 0: break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for f in done:
+                src = futs[f]
+                stat = {"type": src["type"], "url": src["url"], "status": "ok", "count": 0,
+                      "elapsed": round(time.monotonic() - t0, 2), "error": ""}
+                try:
+                    items, elapsed = f.result()
+                    stat["count"], stat["elapsed"] = len(items), round(elapsed, 2)
+                    entries.extend(items)
+                except Exception as ex:
+                    stat["status"], stat["error"] = "error", str(ex)
+                statuses.append(stat)
+    finally:
+        for f in pending:
+            src = futs[f]
+            statuses.append({"type": src["type"], "url": src["url"], "status": "timeout", "count": 0,
+                             "elapsed": round(time.monotonic() - t0, 2), "error": f"deadline {deadline}s 초과"})
+        pool.shutdown(wait=False, cancel_futures=True)
+    # 상태는 원래 소스 순서대로
+    order = {src["url"]: i for i, src in enumerate(sources)}
+    statuses.sort(key=lambda s: order.get(s["url"], 0))
+    return entries, statuses
@@ -0,0 +1,109 @@
+# answer_cache.py
+# 답변 캐시 — 비슷한 질문이 같은 근거를 검색했으면 LLM/Critic을 다시 부르지 않고 저장된(검증 끝난) JSON을 반환
+# - 키: (retriever 주소, 모드, top_k, LLM 주소/모델, 검색된 청크 ID 집합) + 질의 벡터 유사도 ≥ SIM_THRESHOLD
+# - 질의 벡터: 09.10에는 임베딩 모델이 없으므로 한글 2-gram + 영문/숫자 단어의 희소 벡터(코사인 유사도)
+#     "2020년 이후 태양광 보조금 변화" ≈ "태양광 보조금 2020 이후 변화" (어순 무관)
+#   단, 숫자(연도·금액)는 정확히 같아야 함 → "2020년 이후" 캐시가 "2021년 이후" 질문에 쓰이지 않게
+# - 색인 변경: retriever가 알려준 index_version이 바뀌면 그 retriever의 항목 전부 폐기.
+#   버전을 안 알려주는 retriever라도 청크 ID에 본문 해시가 들어가 내용이 바뀌면 키가 달라짐
+# - 프로세스 공용(모든 세션), 메모리 LRU + TTL
+
+import re
+import math
+import time
+import copy
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+SIM_THRESHOLD = 0.85
+MAX_ENTRIES = 256
+ANSWER_TTL = 6 * 3600   # 초
+_WORD = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+_NUM = re.compile(r"\d+(?:[.,]\d+)*")
+
+def embed_query(query: str):
+    """질의 → (정규화된 희소 벡터 dict, 숫자 집합)"""
+    feats = Counter()
+    for w in _WORD.findall((query or "").lower()):
+        if "가" <= w[0] <= "힣" and len(w) > 1:
+            feats.update(w[i:i+2] for i in range(len(w) - 1))
+        else:
+            feats[w] += 1
+    norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+    return {k: v / norm for k, v in feats.items()}, frozenset(_NUM.findall(query or ""))
+
+def similarity(a: dict, b: dict) -> float:
+    if len(a) > len(b): a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+def chunk_id(c: dict) -> str:
+    """검색 청크 식별자: 서버가 준 id가 있으면 그것, 없으면 doc_id + 본문 해시"""
+    if c.get("chunk_id") or c.get("id"):
+        return str(c.get("chunk_id") or c.get("id"))
+    return f"{c.get('doc_id')}#{hashlib.sha1((c.get('text') or '').encode('utf-8')).hexdigest()[:16]}"
+
+class AnswerCache:
+    def __init__(self, threshold=SIM_THRESHOLD, max_entries=MAX_ENTRIES, ttl=ANSWER_TTL):
+        self.threshold, self.max_entries, self.ttl = threshold, max_entries, ttl
+        self._buckets = OrderedDict()   # 키 → [항목] (LRU 순)
+        self._versions = {}             # retriever → 마지막으로 본 index_version
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "stored": 0, "invalidated": 0}
+
+    @staticmethod
+    def _key(retriever, mode, top_k, model_key, chunks):
+        return (retriever, mode, int(top_k), model_key, frozenset(chunk_id(c) for c in chunks))
+
+    def _check_version(self, retriever, index_version):
+        """색인 버전이 바뀌었으면 해당 retriever 항목 폐기 (lock 안에서 호출)"""
+        if index_version is None: return
+        old = self._versions.get(retriever)
+        self._versions[retriever] = index_version
+        if old is None or old == index_version: return
+        for k in [k for k in self._buckets if k[0] == retriever]:
+            self.stats["invalidated"] += len(self._buckets.pop(k))
+
+    def get(self, query, mode, top_k, chunks, retriever="", model_key="", index_version=None, need_verified=False):
+        """적중 시 (저장된 JSON 사본, 유사도, 저장 후 경과 초), 아니면 None"""
+        vec, nums = embed_query(query)
+        key = self._key(retriever, mode, top_k, model_key, chunks)
+        now = time.time()
+        with self._lock:
+            self._check_version(retriever, index_version)
+            entries = self._buckets.get(key) or []
+            entries[:] = [e for e in entries if now - e["at"] < self.ttl]
+            best, best_sim = None, 0.0
+            for e in entries:
+                if e["nums"] != nums or (need_verified and not e["verified"]): continue
+                sim = similarity(vec, e["vec"])
+                if sim >= self.threshold and sim > best_sim:
+                    best, best_sim = e, sim
+            if best is None:
+                self.stats["miss"] += 1
+                return None
+            self._buckets.move_to_end(key)
+            self.stats["hit"] += 1
+            return copy.deepcopy(best["data"]), best_sim, now - best["at"]
+
+    def put(self, query, mode, top_k, chunks, data, retriever="", model_key="", index_version=None, verified=False):
+        vec, nums = embed_query(query)
+        key = self._key(retriever, mode, top_k, model_key, chunks)
+        entry = {"vec": vec, "nums": nums, "data": copy.deepcopy(data), "verified": verified, "at": time.time()}
+        with self._lock:
+            self._check_version(retriever, index_version)
+            entries = self._buckets.setdefault(key, [])
+            entries[:] = [e for e in entries if similarity(vec, e["vec"]) < 0.999 or e["nums"] != nums]  # 같은 질문은 교체
+            entries.append(entry)
+            self._buckets.move_to_end(key)
+            self.stats["stored"] += 1
+            while sum(len(v) for v in self._buckets.values()) > self.max_entries:
+                _, old = next(iter(self._buckets.items()))
+                old.pop(0)
+                if not old: self._buckets.popitem(last=False)
+
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._buckets.values())
+
+ANSWER_CACHE = AnswerCache()  # 프로세스 공용
@@ -3,8 +3,13 @@ import os, json, time
 import streamlit as st
 import pandas as pd
 
-from llm_client import LLMClient
+from llm_client import LLMClient, POTENS_CALLER
+from resilience import stats_text
 from retriever_client import RetrieverClient
+from json_stream import StreamingJSONParser, tolerant_loads
+from quote_verifier import QuoteVerifier
+from answer_cache import ANSWER_CACHE
+from comparison import split_comparison, rrf_merge
 from prompts import SYSTEM_POLICY, USER_QA_TEMPLATE, USER_DIFF_TEMPLATE, CRITIC_TEMPLATE
 
 st.set_page_config(page_title="신재생 정책·규제 원문 인용 검색", layout="wide")
@@ -47,7 +52,11 @@ with right:
         model    = st.text_input("LLM Model (선택)", st.secrets.get("POTENS_MODEL", ""))
         retriever_url = st.text_input("Retriever Base URL", st.secrets.get("RETRIEVER_BASE_URL", ""))
         top_k = st.slider("검색 Top-K (상위 근거 개수)", 4, 16, 8, 1)
-        do_critic = st.checkbox("2차 검증(Critic) 사용", value=True)
+        do_critic = st.checkbox("2차 검증(Critic) 사용", value=True,
+                                help="인용문을 먼저 검색 원문과 로컬 대조하고, 일치하지 않는 인용이 있을 때만 LLM Critic을 호출합니다.")
+        do_stream = st.checkbox("스트리밍 응답(도착하는 대로 표시)", value=True)
+        use_cache = st.checkbox("답변 캐시 사용", value=True,
+                                help="같은 근거가 검색된 비슷한 질문이면 저장된 답변을 바로 보여줍니다.")
 
     # ===== 연결 진단 =====
     with st.expander("🔌 연결 진단(LLM Endpoint)", expanded=False):
@@ -55,10 +64,12 @@ with right:
             llm_test = LLMClient(base_url=base_url, model=model)
             info = llm_test.diagnose()  # Potens /api/chat 진단
             st.write("**/api/chat (Potens 전용)** →", info)
+        st.caption(stats_text(POTENS_CALLER))
 
     # 데이터 소스 배지
     source_mode = "외부 RAG API" if retriever_url else "Mock(데모)"
-    st.caption(f"데이터 소스: **{source_mode}**")
+    cs = ANSWER_CACHE.stats
+    st.caption(f"데이터 소스: **{source_mode}** · 답변 캐시 {ANSWER_CACHE.size()}건 (적중 {cs['hit']} · 미스 {cs['miss']})")
 
     # ===== 챗 UI =====
     if "history" not in st.session_state:
@@ -82,13 +93,14 @@ with right:
         st.session_state.pending_query = manual_query.strip()
 
     # ==== 유틸 ====
-    def ensure_json(txt):
-        s = txt.find("{"); e = txt.rfind("}")
-        return txt[s:e+1] if s>=0 and e>s else txt
-
     def render_json_answer(data, is_diff=False):
         st.markdown("**요약 답변**")
         st.write(data.get("answer", "(answer 없음)"))
+        if data.get("_cache"):
+            c = data["_cache"]
+            st.caption(f"⚡ 캐시된 답변 (질문 유사도 {c['similarity']:.2f} · {c['age']/60:.0f}분 전 생성)")
+        if data.get("_truncated"):
+            st.caption("⚠️ 응답이 중간에 잘려 완성된 부분만 표시합니다.")
 
         if "timeline" in data:
             st.markdown("**변화 타임라인**")
@@ -106,6 +118,42 @@ with right:
         qdf = pd.DataFrame(data.get("quotes", []))
         if not qdf.empty: st.dataframe(qdf, use_container_width=True)
 
+        chk = data.get("_quote_check")
+        if chk:
+            st.caption(f"인용 원문 대조: {chk['verified']}/{chk['checked']} 일치"
+                       + (f" · 불일치 {', '.join(f['path'] for f in chk['failed'])}" if chk["failed"] else "")
+                       + (f" · 출처 누락 {', '.join(chk.get('uncited', []))}" if chk.get("uncited") else "")
+                       + (" · 인용 없음" if not chk["checked"] else "")
+                       + (" · LLM Critic 사용" if chk.get("critic") else ""))
+
+    def stream_json_answer(llm, system, user_prompt, is_diff, box):
+        """
+        chat_stream 조각을 증분 파서에 흘려 넣으며 box에 바로 그린다.
+        answer는 글자가 들어오는 대로, timeline/diff_table/quotes는 원소(행)가 하나 완성될 때마다 표에 추가.
+        반환: (응답 원문 전체, 파서) — 파서가 끝까지 읽었으면 parser.value가 최종 JSON
+        """
+        box.markdown("**요약 답변**")
+        answer_ph = box.empty()
+        sections = [("timeline", "**변화 타임라인**")]
+        if is_diff: sections.append(("diff_table", "**차이 표(diff_table)**"))
+        sections.append(("quotes", "**근거 인용(원문 그대로)**"))
+        tables = {}
+        for key, label in sections:
+            box.markdown(label)
+            tables[key] = (box.empty(), [])
+
+        parser, raw = StreamingJSONParser(), ""
+        for piece in llm.chat_stream(system, user_prompt, temperature=0.2):
+            raw += piece
+            for ev in parser.feed(piece):
+                if ev[0] in ("partial", "field") and ev[1] == "answer" and isinstance(ev[2], str):
+                    answer_ph.write(ev[2] + (" ▌" if ev[0] == "partial" else ""))
+                elif ev[0] == "item" and ev[1] in tables:
+                    ph, rows = tables[ev[1]]
+                    rows.append(ev[3])
+                    ph.dataframe(pd.DataFrame(rows), use_container_width=True)
+        return raw, parser
+
     # 이전 대화 출력
     if st.session_state.history:
         st.divider()
@@ -124,28 +172,43 @@ with right:
         # 0) 사용자 메시지 기록
         st.session_state.history.append({"role":"user","content":query})
 
+        live = st.container()  # 스트리밍 중간 결과(접힌 status 바깥에 표시)
+
         # 진행 상태 표시
         with st.status("검색 준비 중...", expanded=False) as status:
             status.update(label="🔎 유사 문단 검색 중...", state="running")
 
             # 1) 검색 컨텍스트 확보
+            #    비교 질의는 기간/지역별 하위 질의를 동시에 검색해 RRF로 합침 (한쪽 근거만 top-k를 채우지 않게)
             start = time.time()
-            if retriever_url:
-                retriever = RetrieverClient(base_url=retriever_url)
-                chunks = retriever.search(query, k=top_k)
-                def fmt(c):
-                    hdr = f"[{c['doc_id']} p.{c.get('page_start','?')}-{c.get('page_end','?')} lines {c.get('line_start','?')}-{c.get('line_end','?')}]"
-                    return hdr + "\n" + c["text"]
-                context = "\n\n---\n\n".join(fmt(c) for c in chunks) if chunks else "(검색 결과 없음)"
+            retriever = RetrieverClient(base_url=retriever_url)  # 주소가 비면 Mock
+            sides = split_comparison(query) if mode == "비교 질의" else []
+            if sides:
+                labels = [label for label, _ in sides]
+                results = retriever.search_many([sub for _, sub in sides], k=top_k)
+                chunks = rrf_merge(results, top_k, labels=labels)
+                status.write("비교 검색: " + " · ".join(labels) +
+                             f" (질의 {len(labels)}개, 후보 {sum(len(r) for r in results)} → 중복 제거 후 {len(chunks)})")
             else:
-                retriever = RetrieverClient(base_url="")
                 chunks = retriever.search(query, k=top_k)
-                def fmt(c):
-                    hdr = f"[{c['doc_id']} p.{c.get('page_start','?')}-{c.get('page_end','?')} lines {c.get('line_start','?')}-{c.get('line_end','?')}]"
-                    return hdr + "\n" + c["text"]
-                context = "\n\n---\n\n".join(fmt(c) for c in chunks) if chunks else "(검색 결과 없음)"
+            def fmt(c):
+                hdr = f"[{c['doc_id']} p.{c.get('page_start','?')}-{c.get('page_end','?')} lines {c.get('line_start','?')}-{c.get('line_end','?')}]"
+                if c.get("_via"): hdr += f" (검색: {', '.join(c['_via'])})"
+                return hdr + "\n" + c["text"]
+            context = "\n\n---\n\n".join(fmt(c) for c in chunks) if chunks else "(검색 결과 없음)"
             t_search = time.time() - start
 
+            # 1-1) 답변 캐시: 같은 근거(청크 ID 집합)를 찾은 비슷한 질문이면 LLM/Critic 생략
+            cache_args = dict(retriever=retriever_url, model_key=f"{base_url}|{model}", index_version=retriever.index_version)
+            if use_cache:
+                hit = ANSWER_CACHE.get(query, mode, top_k, chunks, need_verified=do_critic, **cache_args)
+                if hit:
+                    data, sim, age = hit
+                    data["_cache"] = {"similarity": sim, "age": age}
+                    st.session_state.history.append({"role":"assistant","content":data,"is_diff":mode != "일반 질의"})
+                    status.update(label=f"⚡ 캐시 적중 (검색 {t_search:.1f}s)", state="complete")
+                    st.rerun()
+
             status.update(label=f"🧠 LLM 호출 중... (검색 {t_search:.1f}s)", state="running")
 
             # 2) 프롬프트 (한국어 강제)
@@ -158,7 +221,15 @@ with right:
 
             # 3) LLM 호출
             llm = LLMClient(base_url=base_url, model=model)
-            raw = llm.chat_json(SYSTEM_POLICY + "\n모든 출력은 한국어로 작성하세요.", user_prompt, temperature=0.2)
+            system_prompt = SYSTEM_POLICY + "\n모든 출력은 한국어로 작성하세요."
+            parser = None
+            if do_stream:
+                status.update(label=f"🧠 LLM 응답 수신 중... (검색 {t_search:.1f}s)", state="running")
+                raw, parser = stream_json_answer(llm, system_prompt, user_prompt, is_diff, live)
+                if llm.stream_error:
+                    st.warning(f"응답 스트림이 중간에 끊겼습니다: {llm.stream_error}")
+            else:
+                raw = llm.chat_json(system_prompt, user_prompt, temperature=0.2)
 
             # └ 연결 오류(JSON 문자열에 _error 포함)면 그대로 표기하고 종료
             if raw.strip().startswith("{") and '"_error"' in raw:
@@ -167,27 +238,45 @@ with right:
                 st.code(raw, language="json")
                 st.stop()
 
-            raw_json = ensure_json(raw)
-
-            # 4) 파싱
-            try:
-                data = json.loads(raw_json)
-            except Exception:
+            # 4) 파싱 (스트리밍이면 이미 읽은 결과 사용). 잘린 응답은 닫힌 필드/원소까지만 살림
+            if parser is not None:
+                data, complete = parser.recovered(), parser.done
+            else:
+                data, complete = tolerant_loads(raw, expect="{")
+            if not isinstance(data, dict) or not data:
                 data = {"answer":"JSON 파싱 실패. 모델 응답 원문을 확인하세요.", "quotes":[], "raw":raw}
+            elif not complete:
+                data["_truncated"] = True
 
-            # 5) Critic (선택)
+            # 5) 검증 (선택): 로컬 인용 대조 → 불일치·출처 누락·인용 없음일 때만 LLM Critic
             if do_critic:
-                status.update(label="🧪 검증(Critic) 중...", state="running")
-                critic_user = CRITIC_TEMPLATE.format(context=context, model_json=json.dumps(data, ensure_ascii=False))
-                critic_raw = llm.chat_json("당신은 JSON 감사지능입니다. 출력은 JSON만.", critic_user, temperature=0.0)
-                cjson = ensure_json(critic_raw)
-                try:
-                    judge = json.loads(cjson)
-                    if not judge.get("is_valid", True) and judge.get("final"):
+                status.update(label="🧪 인용 원문 대조 중...", state="running")
+                verifier = QuoteVerifier(chunks)
+                check = verifier.verify(data)
+                if check["needs_critic"]:
+                    problems = len(check["failed"]) + len(check["uncited"])
+                    status.update(label=f"🧪 검증(Critic) 중... (불일치 인용·출처 누락 {problems}건)", state="running")
+                    critic_user = CRITIC_TEMPLATE.format(context=context, model_json=json.dumps(data, ensure_ascii=False))
+                    if check["failed"]:
+                        critic_user += "\n[로컬 대조에서 원문과 일치하지 않은 인용]\n" + "\n".join(
+                            f"- {f['path']}: {f['quote']}" for f in check["failed"])
+                    if check["uncited"]:
+                        critic_user += "\n[출처(cite)가 없는 항목]\n" + "\n".join(f"- {p}" for p in check["uncited"])
+                    if not check["checked"]:
+                        critic_user += "\n[인용이 하나도 없음 — 모든 주장에 원문 인용을 붙이거나 '자료에 근거 없음'으로 표시]"
+                    critic_raw = llm.chat_json("당신은 JSON 감사지능입니다. 출력은 JSON만.", critic_user, temperature=0.0)
+                    judge, judged = tolerant_loads(critic_raw, expect="{")
+                    if judged and isinstance(judge, dict) and not judge.get("is_valid", True) and isinstance(judge.get("final"), dict) and judge["final"]:
                         data = judge["final"]
+                        check = verifier.verify(data)  # 보정본 다시 대조
                         st.toast("Critic 보정 적용", icon="✅")
-                except Exception:
-                    pass
+                    check["critic"] = True
+                data["_quote_check"] = check
+
+            # 잘리거나 파싱에 실패한 답변은 캐시하지 않음. Critic 뒤에도 인용 불일치/출처 누락이 남으면 미검증으로 저장
+            if use_cache and complete and "raw" not in data:
+                verified = do_critic and not check["needs_critic"]
+                ANSWER_CACHE.put(query, mode, top_k, chunks, data, verified=verified, **cache_args)
 
             # 6) 출력 & 기록
             st.session_state.history.append({"role":"assistant","content":data,"is_diff":is_diff})
@@ -0,0 +1,92 @@
+# comparison.py
+# 비교 질의용 검색 — 질문을 비교 축(기간/지역)별 하위 질의로 나눠 동시에 검색하고 순위 융합(RRF)으로 합침
+# - 한 번의 top-k 검색에 "이전"과 "이후" 근거가 함께 들어온다는 보장이 없음 → 축마다 따로 검색
+# - 분할 규칙(앞에서부터 처음 맞는 것 하나):
+#     연도 2개 이상    "2020년과 2023년 보조금"  → "2020년 보조금", "2023년 보조금"
+#     연도 1개 + 기준점 "2020년 이후 보조금 변화" → "2020년 이전 보조금", "2020년 이후 보조금"
+#     지역/국가 2개 이상 "서울과 부산 REC 가중치" → "서울 REC 가중치", "부산 REC 가중치"
+#     개정 전후        "고시 개정 전후 상한"    → "고시 개정 전 상한", "고시 개정 후 상한"
+#   나눌 축이 없으면 빈 리스트 → 기존처럼 원 질문 하나로 검색
+# - 원 질문 검색 결과는 섞지 않음: 원 질문은 대개 한쪽 축("2020년 이후")과 겹쳐 그쪽 청크에 점수가 두 번 붙고
+#   반대쪽 근거가 다시 top-k 밖으로 밀림. 하위 질의마다 주제어가 들어 있어 공통 근거는 양쪽에서 같이 잡힘
+# - 합치기: 청크 ID(answer_cache.chunk_id)로 중복 제거, 점수 = Σ 1/(RRF_K + 순위) → 상위 k개
+#   목록마다 1위가 같은 점수를 받으므로 한쪽 축 결과가 top-k를 독차지하지 않음
+
+import re
+
+from answer_cache import chunk_id
+
+RRF_K = 60
+MAX_SIDES = 4
+
+_YEAR = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)\s*년?\s*(도|대)?")  # 120204, 20201 같은 긴 숫자 안은 제외
+_PIVOT = re.compile(r"(이후|이전|부터|이래|전후|전|후|대비)(?=\s|$)")
+# 지역명은 어절 첫머리에서 시작하고, 뒤에는 행정구역 접미사·조사만 올 수 있음 ("한국전력", "국내외"는 지역 아님)
+_REGION = re.compile(
+    r"(?<![가-힣A-Za-z])"
+    r"(서울|부산|대구|인천|광주|대전|울산|세종|경기|강원|충북|충남|전북|전남|경북|경남|제주"
+    r"|한국|국내|일본|중국|미국|독일|영국|프랑스|EU|유럽)"
+    r"(?:특별시|광역시|특별자치시|특별자치도|도|시)?"
+    r"(?=$|[^가-힣A-Za-z]|(?:과|와|의|은|는|이|가|에서|에|및)(?![가-힣]))")
+# "개정/시행/도입 전후" 또는 앞 어절과 띄어 쓴 "전후"·"전/후"·"전·후"만 ("발전 후", "지급 전 후속"은 아님)
+_REVISION = re.compile(r"(?<!\S)(?:(\S+)\s+)?(\S*(?:개정|시행|도입))\s*전\s*[/·]?\s*후(?!\S)"
+                       r"|(?<!\S)(\S+)\s+전\s*[/·]?\s*후(?!\S)")
+# 축 표현을 지운 뒤 남는 연결어/비교 표현 (주제어에서 제외)
+_FILLER = {"와", "과", "및", "대", "대비", "vs", "~", "-", "/", "·", ",", "부터", "까지", "간", "사이", "이후", "이전",
+           "이래", "전후", "비교", "비교해줘", "비교해", "주세요", "차이", "차이점", "변화", "요약", "어떻게", "달라졌나",
+           "의", "에서", "에", "는", "은"}  # 지역명을 지운 자리에 남은 조사 ("부산의" → "의")
+
+def _topic(text: str) -> str:
+    words = []
+    for w in re.split(r"[\s~\-/·,]+", text):
+        if not w or w.lower() in _FILLER: continue
+        words.append(w)
+    return " ".join(words)
+
+def split_comparison(query: str):
+    """비교 질문 → [(라벨, 하위 질의)]. 나눌 축이 없으면 []"""
+    q = (query or "").strip()
+    years = list(dict.fromkeys(m.group(1) for m in _YEAR.finditer(q)))
+    if len(years) >= 2:
+        topic = _topic(_YEAR.sub(" ", q))
+        return [(f"{y}년", f"{y}년 {topic}".strip()) for y in years[:MAX_SIDES]]
+    if len(years) == 1:
+        m = _YEAR.search(q)
+        pivot = _PIVOT.match(q[m.end():].lstrip())
+        if pivot or re.search(r"변화|개정|달라", q):
+            y = years[0]
+            rest = q[:m.start()] + " " + (q[m.end():].lstrip()[pivot.end():] if pivot else q[m.end():])
+            topic = _topic(rest)
+            return [(f"{y}년 이전", f"{y}년 이전 {topic}".strip()), (f"{y}년 이후", f"{y}년 이후 {topic}".strip())]
+
+    regions, seen = [], set()
+    for m in _REGION.finditer(q):
+        if m.group(1) not in seen:
+            seen.add(m.group(1)); regions.append(m.group(1))
+    if len(regions) >= 2:
+        topic = _topic(_REGION.sub(" ", q))
+        return [(r, f"{r} {topic}".strip()) for r in regions[:MAX_SIDES]]
+
+    m = _REVISION.search(q)
+    if m:
+        anchor = " ".join(g for g in m.groups() if g)
+        topic = _topic(q[:m.start()] + " " + q[m.end():])
+        return [(f"{anchor} 전".strip(), f"{anchor} 전 {topic}".strip()), (f"{anchor} 후".strip(), f"{anchor} 후 {topic}".strip())]
+    return []
+
+def rrf_merge(result_lists, k, labels=None, rrf_k=RRF_K):
+    """
+    여러 검색 결과 목록 → 중복 제거 + 역순위 융합 상위 k개.
+    각 청크 사본의 "_via"에 그 청크를 찾은 하위 질의 라벨 목록을 남김 (labels가 있을 때).
+    """
+    scores, rows = {}, {}
+    for li, result in enumerate(result_lists):
+        for rank, c in enumerate(result or []):
+            cid = chunk_id(c)
+            scores[cid] = scores.get(cid, 0.0) + 1.0 / (rrf_k + rank + 1)
+            if cid not in rows:
+                rows[cid] = dict(c, _via=[])
+            if labels and labels[li] not in rows[cid]["_via"]:
+                rows[cid]["_via"].append(labels[li])
+    order = sorted(scores, key=lambda cid: -scores[cid])  # 동점은 먼저 나온 순서 유지
+    return [rows[cid] for cid in order[:k]]
@@ -1,6 +1,9 @@
 # llm_client.py  — Potens 전용(비-호환) 엔드포인트 버전
 import os, requests, json
 
+from resilience import CircuitOpenError
+from potens_client import PotensClient, response_text
+
 def _get_secret(name, default=None):
     try:
         import streamlit as st
@@ -8,6 +11,11 @@ def _get_secret(name, default=None):
     except Exception:
         return os.getenv(name, default)
 
+# 모든 LLMClient 인스턴스(세션)가 공유: 연결 풀/keep-alive + 동시 호출 상한(POTENS_MAX_INFLIGHT)
+# + 429/5xx/네트워크 오류 재시도 + 서킷 브레이커 (+ POTENS_HEDGE=1이면 헤지 요청)
+POTENS = PotensClient(hedge=str(_get_secret("POTENS_HEDGE", "0")) == "1")
+POTENS_CALLER = POTENS.caller
+
 class LLMClient:
     """
     Potens 전용 API:
@@ -22,6 +30,8 @@ class LLMClient:
         self.api_key  = api_key  or _get_secret("POTENS_API_KEY")
         self.model    = model    or _get_secret("POTENS_MODEL", "")  # 미사용 가능
         self.timeout  = timeout
+        self.stream_error = None  # 마지막 chat_stream이 도중에 끊겼으면 사유
+        self.last_call = None     # 마지막 chat_json 결과(소요/대기 시간 포함)
 
     def _headers(self):
         return {
@@ -29,31 +39,6 @@ class LLMClient:
             "Content-Type": "application/json"
         }
 
-    def _parse_response_text(self, r):
-        """
-        포텐스 응답 포맷이 명확히 문서화되지 않았으므로, 가능한 키 후보를 순차 탐색.
-        """
-        # JSON 시도
-        try:
-            data = r.json()
-            # 가장 흔한 후보 키들
-            for key in ["answer", "output", "response", "text", "message", "result"]:
-                val = data.get(key)
-                if isinstance(val, str) and val.strip():
-                    return val
-            # 중첩 구조 후보
-            if "data" in data:
-                d = data["data"]
-                for key in ["answer", "output", "response", "text", "message", "result"]:
-                    if isinstance(d, dict) and isinstance(d.get(key), str):
-                        v = d.get(key)
-                        if v.strip(): return v
-            # 최후의 수단: JSON 전체를 문자열로
-            return json.dumps(data, ensure_ascii=False)
-        except ValueError:
-            # JSON 아니면 그냥 텍스트
-            return r.text
-
     def chat_json(self, system, user, temperature=0.2):
         """
         우리 앱은 JSON 응답을 기대하므로, 이 함수는
@@ -73,26 +58,106 @@ class LLMClient:
         if self.model:
             payload["model"] = self.model
 
+        res = POTENS.call(url, payload=payload, api_key=self.api_key, timeout=self.timeout)
+        self.last_call = res
+        if res["status"] == 200:
+            return res["text"]
+        if res["error"]:
+            return json.dumps({"_error": {"potens_api_chat": res["error"]}}, ensure_ascii=False)
+        # 실패면 상세 에러를 문자열로 반환하여 화면에 표시
+        err = {
+            "status": res["status"],
+            "reason": res["reason"],
+            "text": res["text"]
+        }
+        return json.dumps({"_error": {"potens_api_chat": err}}, ensure_ascii=False)
+
+    def chat_json_many(self, system, users, temperature=0.2):
+        """
+        여러 질문을 한 번에(동시 호출 상한 안에서) 보냄 → 입력 순서대로 PotensClient 결과 dict 리스트
+        (각각 "text"와 호출별 "elapsed"/"wait" 포함). 일괄 Q&A/요약용.
+        """
+        url = f"{self.base_url}/api/chat"
+        prompts = [f"[SYSTEM]\n{system}\n\n[USER]\n{u}" for u in users]
+        extra = {"temperature": temperature}
+        if self.model: extra["model"] = self.model
+        return POTENS.gather(url, prompts, payload=extra, api_key=self.api_key, timeout=self.timeout)
+
+    def _delta_text(self, data):
+        """SSE 이벤트 JSON에서 텍스트 조각 추출 (delta/token/text/... 또는 choices[0].delta.content)"""
+        if isinstance(data, str): return data
+        if not isinstance(data, dict): return ""
+        for key in ["delta", "token", "content", "text", "answer", "output", "response", "message"]:
+            val = data.get(key)
+            if isinstance(val, str): return val
+            if isinstance(val, dict):
+                t = self._delta_text(val)
+                if t: return t
+        choices = data.get("choices")
+        if isinstance(choices, list) and choices:
+            return self._delta_text(choices[0])
+        return ""
+
+    def chat_stream(self, system, user, temperature=0.2):
+        """
+        chat_json의 스트리밍 버전: 응답 텍스트를 도착하는 대로 조각(str) 단위로 yield.
+        - text/event-stream(SSE): "data: ..." 줄마다 조각, "data: [DONE]"에서 종료
+        - 그 외 chunked 본문: 받은 바이트를 그대로 텍스트 조각으로
+        - 서버가 스트리밍을 안 하고 JSON 한 덩어리로 주면 chat_json과 같은 방식으로 파싱해 한 번에
+        실패 시 chat_json과 같은 {"_error": ...} 문자열을 한 조각으로 yield.
+        """
+        self.stream_error = None
+        url = f"{self.base_url}/api/chat"
+        payload = {
+            "prompt": f"[SYSTEM]\n{system}\n\n[USER]\n{user}",
+            "temperature": temperature,
+            "stream": True
+        }
+        if self.model:
+            payload["model"] = self.model
         try:
-            r = requests.post(url, headers=self._headers(), json=payload, timeout=self.timeout)
-            if r.status_code == 200:
-                return self._parse_response_text(r)
-            # 실패면 상세 에러를 문자열로 반환하여 화면에 표시
-            err = {
-                "status": r.status_code,
-                "reason": r.reason,
-                "text": r.text
-            }
-            return json.dumps({"_error": {"potens_api_chat": err}}, ensure_ascii=False)
-        except requests.RequestException as e:
-            return json.dumps({"_error": {"potens_api_chat": str(e)}}, ensure_ascii=False)
+            # 재시도/브레이커는 첫 응답(헤더)까지만 적용 — 본문을 받기 시작한 뒤에는 다시 보내지 않음
+            r = POTENS.post(url, payload, api_key=self.api_key, headers={"Accept": "text/event-stream, application/json"},
+                            timeout=self.timeout, stream=True)
+        except (requests.RequestException, CircuitOpenError) as e:
+            yield json.dumps({"_error": {"potens_api_chat": str(e)}}, ensure_ascii=False)
+            return
+        with r:
+            if r.status_code != 200:
+                err = {"status": r.status_code, "reason": r.reason, "text": r.text}
+                yield json.dumps({"_error": {"potens_api_chat": err}}, ensure_ascii=False)
+                return
+            ctype = r.headers.get("Content-Type", "").lower()
+            if r.encoding is None or "charset" not in ctype:
+                r.encoding = "utf-8"  # requests 기본값(ISO-8859-1)이면 한글이 깨짐
+            try:
+                if "text/event-stream" in ctype:
+                    for line in r.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith("data:"): continue  # 주석/event:/id: 줄
+                        data = line[6:] if line.startswith("data: ") else line[5:]  # SSE 규칙: 앞 공백 1개만 제거
+                        if data.strip() == "[DONE]": break
+                        try:
+                            event = json.loads(data)
+                            piece = self._delta_text(event) if isinstance(event, (dict, str)) else data
+                        except ValueError:
+                            piece = data  # JSON이 아닌 순수 텍스트 이벤트
+                        if piece: yield piece
+                elif "application/json" in ctype:
+                    yield response_text(r)
+                else:
+                    for piece in r.iter_content(chunk_size=None, decode_unicode=True):
+                        if piece: yield piece
+            except requests.RequestException as e:
+                # 중간에 끊기면 지금까지 받은 조각은 그대로 두고 오류만 기록(호출 측에서 표시)
+                self.stream_error = f"stream interrupted: {e}"
 
     # 연결 진단: /api/chat 에 아주 짧게 호출해 상태코드/본문을 보여준다
     def diagnose(self):
         url = f"{self.base_url}/api/chat"
         try:
-            r = requests.post(url, headers=self._headers(),
-                              json={"prompt": "ping", "temperature": 0.0}, timeout=self.timeout)
+            # 재시도 없이 그대로 보여주되 연결은 공용 풀 사용
+            r = POTENS.session.post(url, headers=self._headers(),
+                                    json={"prompt": "ping", "temperature": 0.0}, timeout=self.timeout)
             try:
                 text = r.text
                 return {"status": r.status_code, "reason": r.reason, "text": text[:300]}
@@ -0,0 +1,85 @@
+# mock_potens.py
+# 로컬 개발/시험용 가짜 Potens 서버 (/api/chat) — API 키 없이 스트리밍 UI를 확인할 때 사용
+#   python mock_potens.py                    → http://127.0.0.1:8800, SSE 스트리밍
+#   python mock_potens.py --mode chunked     → text/plain chunked 본문
+#   python mock_potens.py --mode json        → 스트리밍 없이 {"answer": "<모델 출력>"} 한 번에
+# 앱 설정의 "LLM Base URL"에 http://127.0.0.1:8800 입력
+# "stream": true가 아닌 요청(chat_json, 진단)은 항상 JSON 한 덩어리로 응답
+
+import sys
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 인용문은 retriever_client의 Mock 원문에서 그대로 가져옴 → 로컬 인용 대조를 통과
+QA_OUTPUT = {
+    "answer": "태양광 보조금 단가는 2020년 이후 단계적으로 낮아졌고, 2021년에는 소형 설비 상한이 줄었습니다. "
+              "2022년 REC 가중치 기준 개정으로 농촌 설비 우대가 생겼고, 2023년에는 자가소비형 세액공제가 확대되었습니다.",
+    "timeline": [
+        {"when": "2020년 이후", "what": "태양광 발전 보조금 단가는 2020년 이후 단계적으로 하향 조정되었다.", "cite": "[doc:신재생_정책보고서_2020, p:5, lines:10-31]"},
+        {"when": "2021년", "what": "2021년 고시에서 소형 설비에 대한 상한이 축소되었으며,", "cite": "[doc:신재생_정책보고서_2021, p:6, lines:11-32]"},
+        {"when": "2022년", "what": "2022년에는 REC 가중치 산정 기준이 개정되며 농촌 지역 설비에 대한 우대 조항이 도입되었다.", "cite": "[doc:신재생_정책보고서_2022, p:7, lines:12-33]"},
+    ],
+    "quotes": [
+        {"doc": "신재생_정책보고서_2021", "page": 6, "quote": "신청 자격 요건에 유지보수 계획 제출이 추가되었다.", "lines": "11-32"},
+        {"doc": "신재생_정책보고서_2023", "page": 8, "quote": "2023년에는 자가소비형 설비의 세액공제 범위가 확대되었다.", "lines": "13-34"},
+    ],
+    "gaps_or_uncertainties": "구체적인 단가 수치는 검색 결과에 없습니다.",
+}
+CRITIC_OUTPUT = {"is_valid": True, "issues": [], "final": None}
+
+class Handler(BaseHTTPRequestHandler):
+    mode = "sse"
+    delay = 0.05
+    piece = 12  # 조각당 글자 수
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/api/chat":
+            self.send_error(404); return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        prompt = body.get("prompt", "")
+        output = CRITIC_OUTPUT if "감사" in prompt[:200] else QA_OUTPUT
+        text = "```json\n" + json.dumps(output, ensure_ascii=False, indent=1) + "\n```"
+        if not body.get("stream") or self.mode == "json":
+            data = json.dumps({"answer": text}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self.send_response(200)
+        ctype = "text/event-stream" if self.mode == "sse" else "text/plain"
+        self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [text[i:i + self.piece] for i in range(0, len(text), self.piece)]
+        for p in pieces:
+            if self.mode == "sse":
+                p = "data: " + json.dumps({"delta": p}, ensure_ascii=False) + "\n\n"
+            self._chunk(p.encode("utf-8"))
+            time.sleep(self.delay)
+        if self.mode == "sse":
+            self._chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+def main(argv):
+    ap = argparse.ArgumentParser(description="가짜 Potens /api/chat 서버")
+    ap.add_argument("--port", type=int, default=8800)
+    ap.add_argument("--mode", choices=["sse", "chunked", "json"], default="sse")
+    ap.add_argument("--delay", type=float, default=0.05, help="조각 사이 지연(초)")
+    args = ap.parse_args(argv)
+    Handler.mode, Handler.delay = args.mode, args.delay
+    print(f"mock Potens ({args.mode}) → http://127.0.0.1:{args.port}/api/chat")
+    ThreadingHTTPServer(("127.0.0.1", args.port), Handler).serve_forever()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
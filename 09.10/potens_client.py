@@ -0,0 +1,130 @@
+# potens_client.py
+# Potens 공용 클라이언트 (09.05·루트 normalizer.py, 09.10/llm_client.py, 3/app.py, 9.15·09.15-2/app.py — 폴더마다 같은 파일)
+# - 공용 세션: 연결 풀 + keep-alive → 호출마다 TCP/TLS를 새로 맺지 않음
+# - 동시 호출 상한(max_inflight): 동기/비동기/일괄 호출이 모두 같은 슬롯을 나눠 씀
+# - 재시도/서킷 브레이커/헤지는 resilience.ResilientCaller (같은 세션 사용)
+# - 동기: call(), gather() / 비동기: await acall(), await agather()
+#   결과는 dict: {"ok", "status", "reason", "text", "error", "elapsed"(요청~응답 초, 재시도 포함), "wait"(슬롯 대기 초)}
+# 비동기 API는 asyncio 이벤트 루프에서 호출하되 실제 HTTP는 풀 스레드에서 돈다(추가 의존성 없음).
+
+import os
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import requests.adapters
+
+from resilience import ResilientCaller, CircuitOpenError
+
+POTENS_MAX_INFLIGHT = int(os.getenv("POTENS_MAX_INFLIGHT", "8"))
+POTENS_TIMEOUT = 60
+TEXT_KEYS = ["answer", "output", "response", "text", "content", "message", "result"]
+
+def response_text(r) -> str:
+    """
+    포텐스 응답 본문 → 모델 출력 문자열. 응답 포맷이 문서화되어 있지 않아 후보 키를 순서대로 탐색:
+    최상위 키 → data.{키} → choices[0].message.content / choices[0].text → JSON 전체 문자열. JSON이 아니면 본문 그대로.
+    """
+    try:
+        data = r.json()
+    except ValueError:
+        return r.text
+    if not isinstance(data, dict):
+        return json.dumps(data, ensure_ascii=False)
+    for src in (data, data.get("data")):
+        if not isinstance(src, dict): continue
+        for key in TEXT_KEYS:
+            val = src.get(key)
+            if isinstance(val, str) and val.strip():
+                return val
+    choices = data.get("choices")
+    if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+        c = choices[0]
+        msg = c.get("message")
+        if isinstance(msg, dict) and isinstance(msg.get("content"), str):
+            return msg["content"]
+        if isinstance(c.get("text"), str):
+            return c["text"]
+    return json.dumps(data, ensure_ascii=False)
+
+def _make_session(pool_size):
+    s = requests.Session()
+    # 헤지 요청까지 고려해 슬롯 수의 2배만큼 연결을 유지 (재시도는 ResilientCaller가 담당 → 어댑터 재시도 없음)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size * 2, max_retries=0)
+    s.mount("http://", adapter); s.mount("https://", adapter)
+    s.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return s
+
+class PotensClient:
+    """프로세스당 하나를 만들어 공유 (엔드포인트/키는 호출마다 지정 가능)"""
+    def __init__(self, max_inflight=POTENS_MAX_INFLIGHT, hedge=False, caller=None, timeout=POTENS_TIMEOUT):
+        self.max_inflight = max(1, max_inflight)
+        self.timeout = timeout
+        self.session = _make_session(self.max_inflight)
+        self.caller = caller or ResilientCaller("potens", hedge=hedge, session=self.session)
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix="potens")
+        self._lock = threading.Lock()
+        self.inflight, self.peak_inflight = 0, 0
+
+    def _headers(self, api_key, headers):
+        h = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        h.update(headers or {})
+        return h
+
+    def post(self, endpoint, payload, api_key=None, headers=None, timeout=None, stream=False, before_attempt=None):
+        """
+        저수준 호출 → requests.Response (재시도 후 최종 응답). 네트워크 오류/브레이커 차단은 예외.
+        슬롯은 응답 헤더를 받을 때까지만 점유 (stream=True면 본문은 호출 측이 읽고 닫음).
+        """
+        t0 = time.monotonic()
+        with self._slots:
+            wait = time.monotonic() - t0
+            with self._lock:
+                self.inflight += 1
+                self.peak_inflight = max(self.peak_inflight, self.inflight)
+            try:
+                r = self.caller.post(endpoint, before_attempt=before_attempt, headers=self._headers(api_key, headers),
+                                     json=payload, timeout=timeout or self.timeout, stream=stream)
+            finally:
+                with self._lock: self.inflight -= 1
+        r.potens_wait = wait
+        return r
+
+    def call(self, endpoint, prompt=None, payload=None, api_key=None, headers=None, timeout=None, before_attempt=None):
+        """동기 호출 1건 → 결과 dict. prompt만 주면 {"prompt": prompt}로 보냄."""
+        payload = dict(payload or {})
+        if prompt is not None: payload["prompt"] = prompt
+        t0 = time.monotonic()
+        res = {"ok": False, "status": None, "reason": "", "text": "", "error": None, "elapsed": 0.0, "wait": 0.0}
+        try:
+            r = self.post(endpoint, payload, api_key=api_key, headers=headers, timeout=timeout, before_attempt=before_attempt)
+            res["wait"] = r.potens_wait
+            res.update(status=r.status_code, reason=r.reason, ok=200 <= r.status_code < 300)
+            res["text"] = response_text(r) if res["ok"] else r.text
+        except (requests.RequestException, CircuitOpenError) as e:
+            res["error"] = str(e)
+        res["elapsed"] = time.monotonic() - t0 - res["wait"]
+        return res
+
+    def _queued_call(self, queued_at, endpoint, prompt, kwargs):
+        """풀에서 실행: 풀 대기 시간도 wait에 합산"""
+        queued = time.monotonic() - queued_at
+        res = self.call(endpoint, prompt, **kwargs)
+        res["wait"] += queued
+        return res
+
+    def gather(self, endpoint, prompts, **kwargs):
+        """여러 프롬프트를 동시에(최대 max_inflight) 보내고 입력 순서대로 결과 리스트. 이 풀의 스레드 안에서 부르지 말 것."""
+        t0 = time.monotonic()
+        futs = [self._pool.submit(self._queued_call, t0, endpoint, p, kwargs) for p in prompts]
+        return [f.result() for f in futs]
+
+    async def acall(self, endpoint, prompt=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._queued_call, time.monotonic(), endpoint, prompt, kwargs)
+
+    async def agather(self, endpoint, prompts, **kwargs):
+        return await asyncio.gather(*(self.acall(endpoint, p, **kwargs) for p in prompts))
@@ -0,0 +1,114 @@
+# quote_verifier.py
+# 로컬 인용 검증기 — LLM Critic 앞단의 결정적(deterministic) 검사
+# - 검색 청크(context)를 한 번만 색인하고, 응답 JSON의 모든 인용(quotes / timeline / diff_table)을 원문과 대조
+# - 일치 판정 순서: 그대로 일치(exact) → 공백 정규화(연속 공백·줄바꿈을 한 칸으로) → 공백 제거(PDF 줄바꿈으로 어절이 끊긴 경우)
+# - 인용 앞뒤의 따옴표는 무시, 중간 생략부호(…, ...)가 있으면 조각마다 같은 청크 안에서 순서대로 찾음
+# - 인용이 하나도 없는 답변, 출처(cite) 없는 timeline/diff_table 항목은 "근거 없는 주장"으로 따로 집계
+# 불일치 인용이나 근거 없는 주장이 있을 때(needs_critic)만 LLM Critic을 부르면 된다.
+
+import re
+import unicodedata
+from bisect import bisect_right
+
+_WS = re.compile(r"\s+")
+_ELLIPSIS = re.compile(r"\s*(?:…|\.{3,})\s*")
+_QUOTE_CHARS = "\"'“”‘’「」『』<>《》 \t\r\n"
+_SEP = "\x00"  # 청크 경계 — 인용이 두 청크에 걸쳐 일치하지 않도록
+
+def _nfc(s: str) -> str:
+    return unicodedata.normalize("NFC", s or "")
+
+def collapse_ws(s: str) -> str:
+    return _WS.sub(" ", _nfc(s)).strip()
+
+def strip_ws(s: str) -> str:
+    return _WS.sub("", _nfc(s))
+
+LEVELS = (("exact", _nfc), ("whitespace", collapse_ws), ("compact", strip_ws))
+
+def iter_quotes(data: dict):
+    """응답 JSON → (위치, 인용문) 목록. 위치는 화면/Critic 안내용 문자열 (예: quotes[2], diff_table[0].before)"""
+    out = []
+    for i, q in enumerate(data.get("quotes") or []):
+        out.append((f"quotes[{i}]", q.get("quote", "") if isinstance(q, dict) else q))
+    for i, t in enumerate(data.get("timeline") or []):
+        if isinstance(t, dict): out.append((f"timeline[{i}]", t.get("what", "")))
+    for i, row in enumerate(data.get("diff_table") or []):
+        if not isinstance(row, dict): continue
+        for side in ("before", "after"):
+            v = row.get(side)
+            out.append((f"diff_table[{i}].{side}", v.get("value", "") if isinstance(v, dict) else v))
+    return [(path, text if isinstance(text, str) else "") for path, text in out]
+
+def iter_uncited(data: dict):
+    """출처 표기가 빠진 주장 위치 목록 (timeline[i], diff_table[i].before 등)"""
+    out = []
+    for i, t in enumerate(data.get("timeline") or []):
+        if isinstance(t, dict) and not str(t.get("cite") or "").strip(): out.append(f"timeline[{i}]")
+    for i, row in enumerate(data.get("diff_table") or []):
+        if not isinstance(row, dict): continue
+        for side in ("before", "after"):
+            v = row.get(side)
+            if not (isinstance(v, dict) and str(v.get("cite") or "").strip()): out.append(f"diff_table[{i}].{side}")
+    return out
+
+class QuoteVerifier:
+    def __init__(self, chunks):
+        """chunks: 검색 결과 [{doc_id, text, ...}] — 정규화 단계별로 이어 붙인 본문을 한 번만 만들어 둔다"""
+        self.chunks = [c for c in chunks or [] if isinstance(c, dict)]
+        self._corpus = {}
+        for name, norm in LEVELS:
+            parts = [norm(c.get("text", "")) for c in self.chunks]
+            starts, pos = [], 0
+            for p in parts:
+                starts.append(pos)
+                pos += len(p) + 1
+            self._corpus[name] = (_SEP.join(parts), starts)
+
+    def _find(self, level, fragments):
+        """모든 조각이 같은 청크 안에 순서대로 있으면 그 청크 번호, 없으면 None"""
+        text, starts = self._corpus[level]
+        pos = 0
+        while True:
+            i = text.find(fragments[0], pos)
+            if i < 0: return None
+            ci = bisect_right(starts, i) - 1
+            end = starts[ci + 1] - 1 if ci + 1 < len(starts) else len(text)
+            j, ok = i + len(fragments[0]), True
+            for frag in fragments[1:]:
+                j = text.find(frag, j, end)
+                if j < 0: ok = False; break
+                j += len(frag)
+            if ok and j <= end: return ci
+            pos = i + 1
+
+    def check(self, quote: str) -> dict:
+        """인용 하나 검사 → {"ok", "method", "doc_id"}"""
+        q = (quote or "").strip(_QUOTE_CHARS)
+        if not q.strip(): return {"ok": False, "method": "empty", "doc_id": None}
+        for name, norm in LEVELS:
+            frags = [f for f in (norm(p) for p in _ELLIPSIS.split(q)) if f]
+            if not frags: break
+            ci = self._find(name, frags)
+            if ci is not None:
+                return {"ok": True, "method": name, "doc_id": self.chunks[ci].get("doc_id")}
+        return {"ok": False, "method": "not_found", "doc_id": None}
+
+    def verify(self, data: dict) -> dict:
+        """
+        응답 JSON 전체 검사 → {"checked", "verified", "failed": [{"path","quote","reason"}], "uncited": [위치],
+        "methods": {...}, "needs_critic"}. 인용이 하나도 없으면(checked == 0) 검증된 것으로 보지 않음.
+        """
+        report = {"checked": 0, "verified": 0, "failed": [], "uncited": [], "methods": {}, "needs_critic": True}
+        if not isinstance(data, dict): return report
+        report["uncited"] = iter_uncited(data)
+        for path, quote in iter_quotes(data):
+            res = self.check(quote)
+            report["checked"] += 1
+            if res["ok"]:
+                report["verified"] += 1
+                report["methods"][res["method"]] = report["methods"].get(res["method"], 0) + 1
+            else:
+                report["failed"].append({"path": path, "quote": quote, "reason": res["method"]})
+        report["needs_critic"] = bool(report["failed"] or report["uncited"] or not report["checked"])
+        return report
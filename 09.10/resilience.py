@@ -0,0 +1,178 @@
+# resilience.py
+# Potens 호출 공용 복원력 계층 (potens_client.py가 사용 — 09.05·루트·09.10·3·9.15·09.15-2 폴더마다 같은 파일)
+# - 재시도: 네트워크 오류 / 429 / 5xx만, 지수 백오프 + 지터(full jitter), Retry-After 헤더 우선
+# - 서킷 브레이커: 연속 실패가 쌓이면 잠시 호출 자체를 막고(빠른 실패), 쿨다운 뒤 1건으로 시험
+# - 헤지 요청(선택): 응답이 최근 p95 지연보다 늦으면 같은 요청을 하나 더 보내 먼저 온 응답 사용
+# - 결과 카운터(stats): 화면/로그에 그대로 표시
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+
+RETRY_ATTEMPTS = int(os.getenv("POTENS_RETRY_ATTEMPTS", "3"))  # 첫 시도 포함
+BACKOFF_BASE = 0.5        # 초
+BACKOFF_MAX = 8.0
+BREAKER_FAILURES = 5      # 연속 실패 몇 번이면 차단
+BREAKER_COOLDOWN = 30.0   # 차단 유지 시간(초) → 이후 시험 호출 1건 허용
+HEDGE_MIN_SAMPLES = 20    # p95 추정에 필요한 최소 표본 수
+LATENCY_WINDOW = 200
+
+def is_retryable_status(status: int) -> bool:
+    return status == 429 or 500 <= status < 600
+
+class CircuitOpenError(RuntimeError):
+    """브레이커가 열려 있어 호출하지 않음"""
+
+class CircuitBreaker:
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures, self.cooldown = failures, cooldown
+        self.state, self.fail_count, self.opened_at = "closed", 0, 0.0
+        self._trial = None  # 시험 호출 중인 스레드 id
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed": return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"; self._trial = None
+            if self.state == "half_open" and self._trial is None:
+                self._trial = threading.get_ident()  # 시험 호출은 한 번에 1건만
+                return True
+            return False
+
+    def release(self):
+        """시도가 끝나면 호출(예외 종류와 무관하게) — 결과 기록 없이 끝난 시험 호출이 반열림 상태를 막지 않게"""
+        with self._lock:
+            if self._trial == threading.get_ident(): self._trial = None
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.state, self.fail_count = "closed", 0
+                return
+            self.fail_count += 1
+            if self.state == "half_open" or self.fail_count >= self.failures:
+                self.state, self.opened_at = "open", time.monotonic()
+
+class ResilientCaller:
+    """
+    requests 호출을 감싸는 재시도/브레이커/헤지 래퍼. 엔드포인트(서비스)당 하나를 만들어 프로세스에서 공유.
+    post()는 최종 Response를 돌려주거나(4xx 등 재시도 대상이 아닌 응답 포함) 마지막 예외를 올린다.
+    """
+    def __init__(self, name="potens", attempts=RETRY_ATTEMPTS, hedge=False, breaker=None, session=None):
+        self.name, self.attempts, self.hedge = name, max(1, attempts), hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.session = session or requests
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix=f"{name}-hedge") if hedge else None
+        self.stats = {"calls": 0, "ok": 0, "failed": 0, "retries": 0, "rejected": 0,
+                      "status_429": 0, "status_5xx": 0, "errors": 0, "hedged": 0, "hedge_wins": 0}
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def p95(self):
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES: return None
+            xs = sorted(self._latencies)
+        return xs[int(0.95 * (len(xs) - 1))]
+
+    def _send(self, url, kwargs):
+        t0 = time.monotonic()
+        r = self.session.post(url, **kwargs)
+        if 200 <= r.status_code < 300:
+            with self._lock: self._latencies.append(time.monotonic() - t0)
+        return r
+
+    @staticmethod
+    def _discard(fut):
+        """버리는 요청의 응답을 닫아 연결을 풀에 돌려줌 (아직 진행 중이면 끝날 때 닫음)"""
+        def close(f):
+            try:
+                f.result().close()
+            except Exception:
+                pass
+        fut.add_done_callback(close)
+
+    def _send_hedged(self, url, kwargs, before_attempt=None):
+        """p95 지연까지 기다려도 응답이 없으면 같은 요청을 하나 더 보내고 먼저 끝난 쪽을 사용 (추가 요청도 before_attempt를 거침)"""
+        delay = self.p95()
+        if self._hedge_pool is None or delay is None: return self._send(url, kwargs)
+        first = self._hedge_pool.submit(self._send, url, kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done: return first.result()
+        if before_attempt is not None: before_attempt()
+        if first.done(): return first.result()  # 호출률 대기 중에 첫 요청이 끝남
+        self.count("hedged")
+        second = self._hedge_pool.submit(self._send, url, kwargs)
+        futs = [first, second]
+        while futs:
+            done, _ = wait(futs, return_when=FIRST_COMPLETED)
+            for f in done:
+                futs.remove(f)
+                try:
+                    r = f.result()
+                except requests.RequestException:
+                    if not futs: raise
+                    continue
+                if 200 <= r.status_code < 300 or not futs:
+                    if f is second: self.count("hedge_wins")
+                    for other in futs: self._discard(other)
+                    return r
+                r.close()
+        raise requests.RequestException("hedged requests failed")  # 도달하지 않음
+
+    def post(self, url, before_attempt=None, **kwargs):
+        """
+        before_attempt: 매 시도 직전에 부를 함수(예: 토큰 버킷 acquire) — 재시도도 호출률 제한을 따르게
+        """
+        self.count("calls")
+        last_exc, r = None, None
+        for attempt in range(self.attempts):
+            if not self.breaker.allow():
+                self.count("rejected")
+                if r is not None: return r
+                raise last_exc or CircuitOpenError(f"{self.name}: circuit open")
+            if attempt: self.count("retries")
+            try:
+                if before_attempt is not None: before_attempt()
+                if r is not None: r.close()  # 재시도로 버리는 429/5xx 응답 (stream=True면 연결을 잡고 있음)
+                r = self._send_hedged(url, kwargs, before_attempt) if self.hedge else self._send(url, kwargs)
+                last_exc = None
+            except requests.RequestException as e:
+                last_exc, r = e, None
+                self.count("errors")
+                self.breaker.record(False)
+            else:
+                if not is_retryable_status(r.status_code):
+                    self.breaker.record(True)  # 4xx도 서버는 살아 있음
+                    self.count("ok" if 200 <= r.status_code < 300 else "failed")
+                    return r
+                self.count("status_429" if r.status_code == 429 else "status_5xx")
+                self.breaker.record(False)
+            finally:
+                self.breaker.release()
+            if attempt + 1 < self.attempts:
+                time.sleep(self._backoff(attempt, r))
+        self.count("failed")
+        if r is not None: return r
+        raise last_exc
+
+    @staticmethod
+    def _backoff(attempt, r=None):
+        retry_after = r is not None and r.headers.get("Retry-After", "")
+        if retry_after and retry_after.strip().isdigit():
+            return min(BACKOFF_MAX, float(retry_after))
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def stats_text(caller) -> str:
+    s = caller.stats
+    return (f"Potens 호출 {s['calls']} · 성공 {s['ok']} · 실패 {s['failed']} · 재시도 {s['retries']} "
+            f"(429 {s['status_429']} · 5xx {s['status_5xx']} · 네트워크 {s['errors']}) · 차단 {s['rejected']} · "
+            f"헤지 {s['hedged']}(승 {s['hedge_wins']}) · 브레이커 {caller.breaker.state}")
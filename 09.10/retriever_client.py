@@ -1,22 +1,132 @@
-import os, requests, textwrap, random
+import os, requests, textwrap, random, time, threading
+import requests.adapters
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 모든 RetrieverClient(세션)가 공유하는 연결 풀 / 결과 캐시 ---
+RETRIEVER_CONNECTIONS = 8
+SEARCH_CACHE_TTL = 300       # 초. 버전 헤더가 없는 서버는 이 시간만큼만 캐시
+SEARCH_CACHE_MAX = 512
+VERSION_CHECK_EVERY = 5      # 초. 버전을 알려주는 서버는 캐시 적중 전에 이 간격으로 /health 헤더로 색인 버전 재확인
+
+def _make_session():
+    s = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=RETRIEVER_CONNECTIONS)
+    s.mount("http://", adapter); s.mount("https://", adapter)
+    return s
+
+SESSION = _make_session()
+_FANOUT = ThreadPoolExecutor(max_workers=RETRIEVER_CONNECTIONS, thread_name_prefix="retriever")
+
+class SearchCache:
+    """
+    (서버, 질의, k) → 검색 결과. 서버 응답의 X-Index-Version이 바뀌면 그 서버의 항목을 모두 폐기
+    버전을 알려준 서버는 적중 결과를 돌려주기 전에 VERSION_CHECK_EVERY초에 한 번 버전을 재확인
+    (needs_check → 호출 측이 /health 요청 → checked). 확인이 안 되면 그 서버 항목을 버림.
+    """
+    def __init__(self, ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX):
+        self.ttl, self.max_entries = ttl, max_entries
+        self._items = OrderedDict()
+        self._versions = {}
+        self._checked_at = {}  # base_url → 마지막으로 버전을 확인한 시각
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "invalidated": 0}
+
+    def version(self, base_url):
+        with self._lock:
+            return self._versions.get(base_url)
+
+    def needs_check(self, base_url) -> bool:
+        with self._lock:
+            return base_url in self._versions and time.time() - self._checked_at.get(base_url, 0) >= VERSION_CHECK_EVERY
+
+    def checked(self, base_url, version):
+        """재확인 결과 반영. version이 None이면(헤더 없음/요청 실패) 확인 불가 → 그 서버 항목 폐기"""
+        with self._lock:
+            self._checked_at[base_url] = time.time()
+            if version is not None:
+                self._observe(base_url, version)
+                return
+            for key in [key for key in self._items if key[0] == base_url]:
+                del self._items[key]
+                self.stats["invalidated"] += 1
+
+    def get(self, base_url, query, k):
+        key = (base_url, query.strip(), int(k))
+        with self._lock:
+            e = self._items.get(key)
+            if e is None or time.time() - e["at"] > self.ttl:
+                self.stats["miss"] += 1
+                return None
+            self._items.move_to_end(key)
+            self.stats["hit"] += 1
+            return e["rows"]
+
+    def put(self, base_url, query, k, rows, version):
+        with self._lock:
+            self._observe(base_url, version)
+            self._items[(base_url, query.strip(), int(k))] = {"rows": rows, "at": time.time()}
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def _observe(self, base_url, version):
+        if version is None: return
+        old = self._versions.get(base_url)
+        self._versions[base_url] = version
+        self._checked_at[base_url] = time.time()
+        if old is not None and old != version:
+            for key in [key for key in self._items if key[0] == base_url]:
+                del self._items[key]
+                self.stats["invalidated"] += 1
+
+SEARCH_CACHE = SearchCache()  # 프로세스 공용
 
 class RetrieverClient:
     """
     팀원 검색 API가 생기면 base_url을 넣고 아래 주석 부분을 실제 엔드포인트에 맞추면 됩니다.
     없으면 데모용 Mock 데이터를 반환합니다.
+      POST {base_url}/search        {"query", "k"}    → [청크]
+      POST {base_url}/search_batch  {"queries", "k"}  → {"results": [[청크], ...]}  (선택 — 없으면 동시 개별 호출)
+    응답 헤더 X-Index-Version이 있으면 색인 버전으로 보고 결과 캐시/답변 캐시 무효화에 사용.
+      GET  {base_url}/health  → 버전 재확인용 (헤더만 봄)
     """
+    _batch_supported = {}  # base_url → False (배치 엔드포인트가 404/405였던 서버)
+
     def __init__(self, base_url=None, api_key=None, timeout=30):
         self.base_url = (base_url or os.getenv("RETRIEVER_BASE_URL") or "").rstrip("/")
         self.api_key  = api_key or os.getenv("RETRIEVER_API_KEY")
         self.timeout  = timeout
+        self.index_version = None  # 서버가 X-Index-Version 헤더로 알려주는 색인 버전 (답변 캐시 무효화용)
+
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def _revalidate(self):
+        """캐시 적중을 쓰기 전에 서버 색인 버전 확인 (서버별 VERSION_CHECK_EVERY초에 한 번, 응답 본문은 안 읽음)"""
+        if not SEARCH_CACHE.needs_check(self.base_url): return
+        try:
+            r = SESSION.get(f"{self.base_url}/health", headers=self._headers(), timeout=min(5, self.timeout))
+            version = r.headers.get("X-Index-Version")
+            r.close()
+        except requests.RequestException:
+            version = None
+        SEARCH_CACHE.checked(self.base_url, version)
+
+    def _fetch(self, query, k):
+        r = SESSION.post(f"{self.base_url}/search", headers=self._headers(), json={"query": query, "k": k}, timeout=self.timeout)
+        r.raise_for_status()
+        rows = r.json()
+        SEARCH_CACHE.put(self.base_url, query, k, rows, r.headers.get("X-Index-Version"))
+        return rows
 
     def search(self, query, k=8):
         if self.base_url:
-            url = f"{self.base_url}/search"
-            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
-            r = requests.post(url, headers=headers, json={"query": query, "k": k}, timeout=self.timeout)
-            r.raise_for_status()
-            return r.json()
+            self._revalidate()
+            rows = SEARCH_CACHE.get(self.base_url, query, k)
+            if rows is None:
+                rows = self._fetch(query, k)
+            self.index_version = SEARCH_CACHE.version(self.base_url)
+            return rows
 
         # ---- 데모 Mock 결과 ----
         dummy = textwrap.dedent("""
@@ -37,3 +147,33 @@ class RetrieverClient:
                 "text": dummy
             })
         return rows
+
+    def search_many(self, queries, k=8):
+        """
+        여러 질의를 한 번에 → 입력 순서대로 결과 리스트.
+        캐시에 있는 것은 바로, 나머지는 배치 엔드포인트(있으면) 한 번 또는 동시 개별 호출.
+        """
+        if not self.base_url:
+            return [self.search(q, k) for q in queries]
+        self._revalidate()
+        out = [SEARCH_CACHE.get(self.base_url, q, k) for q in queries]
+        todo = list(dict.fromkeys(q for q, rows in zip(queries, out) if rows is None))
+        fetched = {}
+        if len(todo) > 1 and self._batch_supported.get(self.base_url, True):
+            r = SESSION.post(f"{self.base_url}/search_batch", headers=self._headers(),
+                             json={"queries": todo, "k": k}, timeout=self.timeout)
+            if r.status_code in (404, 405):
+                self._batch_supported[self.base_url] = False
+            else:
+                r.raise_for_status()
+                version = r.headers.get("X-Index-Version")
+                for q, rows in zip(todo, r.json().get("results", [])):
+                    SEARCH_CACHE.put(self.base_url, q, k, rows, version)
+                    fetched[q] = rows
+        rest = [q for q in todo if q not in fetched]
+        if len(rest) == 1:
+            fetched[rest[0]] = self._fetch(rest[0], k)
+        elif rest:
+            fetched.update(zip(rest, _FANOUT.map(lambda q: self._fetch(q, k), rest)))
+        self.index_version = SEARCH_CACHE.version(self.base_url)
+        return [rows if rows is not None else fetched[q] for q, rows in zip(queries, out)]
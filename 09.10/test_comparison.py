@@ -0,0 +1,37 @@
+import pytest
+
+from comparison import split_comparison, rrf_merge
+
+@pytest.mark.parametrize("query", [
+    "태양광 발전 후 보조금 정책",      # "발전" 안의 "전"
+    "지급 전 후속 조치",              # "후속"의 "후"
+    "한국전력 요금과 일본 요금",       # "한국전력"은 지역 아님
+    "국내외 보조금 비교",
+    "설비 120204대와 2021년 보조금",   # 긴 숫자 안의 "2020"
+    "태양광 보조금 요약",
+])
+def test_no_split_for_ordinary_words(query):
+    assert split_comparison(query) == []
+
+@pytest.mark.parametrize("query, labels", [
+    ("2020년 이후 태양광 보조금 정책 변화", ["2020년 이전", "2020년 이후"]),
+    ("2021년과 2023년 REC 가중치 비교", ["2021년", "2023년"]),
+    ("서울과 부산의 태양광 보조금 비교", ["서울", "부산"]),
+    ("경기도와 서울시 보조금", ["경기", "서울"]),
+    ("고시 개정 전후 소형 설비 상한", ["고시 개정 전", "고시 개정 후"]),
+    ("REC 개정 전/후 가중치", ["REC 개정 전", "REC 개정 후"]),
+    ("코로나 전후 태양광 투자", ["코로나 전", "코로나 후"]),
+])
+def test_split_labels(query, labels):
+    assert [label for label, _ in split_comparison(query)] == labels
+
+def test_sub_queries_keep_topic():
+    sides = split_comparison("2020년 이후 태양광 보조금 정책 변화")
+    assert [sub for _, sub in sides] == ["2020년 이전 태양광 보조금 정책", "2020년 이후 태양광 보조금 정책"]
+
+def test_rrf_merge_dedupes_and_interleaves():
+    before = [{"doc_id": d, "text": d} for d in ("B0", "B1", "S")]
+    after = [{"doc_id": d, "text": d} for d in ("A0", "S", "A1")]
+    merged = rrf_merge([before, after], 4, labels=["이전", "이후"])
+    assert [c["doc_id"] for c in merged] == ["S", "B0", "A0", "B1"]
+    assert merged[0]["_via"] == ["이전", "이후"]
@@ -0,0 +1,222 @@
+# retriever_server.py
+# 자체 호스팅 검색 서버 — 09.10/retriever_client.py가 기대하는 계약을 rag.VectorStore로 구현
+#   POST /search        {"query": "...", "k": 8}    → [{"doc_id","page_start","page_end","line_start","line_end","text","chunk_id"}]
+#   POST /search_batch  {"queries": [...], "k": 8}  → {"results": [[...], ...]}
+#   GET  /stats         대기열 길이, 임베딩 배치 크기, 단계별 지연 p50/p95/p99(ms)
+#   GET  /health
+# - 모든 응답에 X-Index-Version 헤더 (색인이 바뀌면 값이 바뀜 → 클라이언트 결과/답변 캐시 무효화)
+# - 질의 임베딩은 전용 워커 스레드 하나가 담당: 동시에 들어온 질의를 최대 EMBED_MAX_BATCH개,
+#   EMBED_MAX_WAIT_MS까지 모아 model.encode 한 번으로 처리
+# - 색인은 시작할 때 --index로만 만든다 (HTTP로 서버 로컬 파일을 색인/초기화하는 경로는 두지 않음)
+# - 모델/색인은 프로세스에 한 번만 올라가고 모든 프런트엔드(09.10, 9.15 …)가 HTTP로 공유
+#   python retriever_server.py --port 8900 --persist-dir chroma_store --index a.pdf b.pdf
+#   09.10 설정의 "Retriever Base URL"에 http://127.0.0.1:8900
+# RETRIEVER_API_KEY 환경변수가 있으면 Authorization: Bearer <키> 를 검사
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rag import extract_pages, chunk_text, get_store, DEFAULT_MODEL
+
+EMBED_MAX_BATCH = 32
+EMBED_MAX_WAIT_MS = 5
+MAX_K = 50
+LATENCY_WINDOW = 2000
+BOOT_ID = format(int(time.time()), "x")  # 재시작하면 버전 카운터가 0부터라 부팅 식별자를 앞에 붙임
+
+class LatencyStats:
+    """단계별 최근 지연 기록 → 백분위수"""
+    def __init__(self, window=LATENCY_WINDOW):
+        self._data = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, name, value):
+        with self._lock:
+            self._data.setdefault(name, deque(maxlen=self._window)).append(value)
+
+    def snapshot(self):
+        with self._lock:
+            data = {k: sorted(v) for k, v in self._data.items()}
+        pick = lambda xs, q: xs[min(len(xs) - 1, int(q * len(xs)))]
+        return {k: {"count": len(xs), "p50": round(pick(xs, 0.50), 2), "p95": round(pick(xs, 0.95), 2),
+                    "p99": round(pick(xs, 0.99), 2)} for k, xs in data.items() if xs}
+
+STATS = LatencyStats()
+
+class EmbedBatcher:
+    """동시 질의를 모아 한 번에 encode하는 전용 워커"""
+    def __init__(self, model, max_batch=EMBED_MAX_BATCH, max_wait_ms=EMBED_MAX_WAIT_MS):
+        self.model, self.max_batch, self.max_wait = model, max_batch, max_wait_ms / 1000
+        self._q = queue.Queue()
+        self.batches = 0
+        threading.Thread(target=self._run, name="embed-batcher", daemon=True).start()
+
+    def depth(self) -> int:
+        return self._q.qsize()
+
+    def encode(self, texts):
+        """텍스트 리스트 → 임베딩 리스트 (워커가 처리할 때까지 대기)"""
+        now = time.monotonic()
+        futs = []
+        for t in texts:
+            f = Future()
+            self._q.put((t, f, now))
+            futs.append(f)
+        return [f.result() for f in futs]
+
+    def _run(self):
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: break
+                try:
+                    batch.append(self._q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            t0 = time.monotonic()
+            try:
+                embs = self.model.encode([b[0] for b in batch], convert_to_numpy=True).tolist()
+            except Exception as e:
+                for _, f, _ in batch: f.set_exception(e)
+                continue
+            elapsed = time.monotonic() - t0
+            self.batches += 1
+            STATS.record("encode_ms", elapsed * 1000)
+            STATS.record("batch_size", len(batch))
+            for (_, f, enq), emb in zip(batch, embs):
+                STATS.record("queue_wait_ms", (t0 - enq) * 1000)
+                f.set_result(emb)
+
+def to_contract(hit: dict) -> dict:
+    """VectorStore 결과 → retriever_client 계약 형식"""
+    return {"doc_id": hit.get("pdf_id"), "page_start": hit.get("page"), "page_end": hit.get("page"),
+            "line_start": hit.get("line_start"), "line_end": hit.get("line_end"),
+            "text": hit.get("content"), "chunk_id": hit.get("id")}
+
+class RetrieverService:
+    def __init__(self, store, batcher):
+        self.store, self.batcher = store, batcher
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def index_version(self) -> str:
+        return f"{BOOT_ID}.{self.store.version}"
+
+    def search_many(self, queries, k):
+        t0 = time.monotonic()
+        with self._lock: self._inflight += 1
+        try:
+            embs = self.batcher.encode(queries)
+            t1 = time.monotonic()
+            results = [[to_contract(h) for h in self.store.query_embedding(e, k=k)] for e in embs]
+            STATS.record("search_ms", (time.monotonic() - t1) * 1000 / max(1, len(queries)))
+        finally:
+            with self._lock: self._inflight -= 1
+        STATS.record("request_ms", (time.monotonic() - t0) * 1000)
+        return results
+
+    def index_pdf(self, path, doc_id=None, reset=False):
+        pages = extract_pages(path)
+        chunks = chunk_text(pages, max_chars=1200, overlap=200)
+        if reset: self.store.reset()
+        self.store.add_chunks(pdf_id=doc_id or os.path.basename(path), chunks=chunks)
+        return len(chunks)
+
+    def stats(self):
+        return {"index_version": self.index_version(), "queue_depth": self.batcher.depth(),
+                "inflight": self._inflight, "batches": self.batcher.batches,
+                "max_batch": self.batcher.max_batch, "max_wait_ms": self.batcher.max_wait * 1000,
+                "latency": STATS.snapshot()}
+
+def _k(body):
+    try:
+        return max(1, min(MAX_K, int(body.get("k", 8))))
+    except (TypeError, ValueError):
+        raise ValueError("k must be an integer")
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (클라이언트 연결 풀 재사용)
+    service = None
+    api_key = os.getenv("RETRIEVER_API_KEY")
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, obj):
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Index-Version", self.service.index_version())
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        if not self.api_key: return True
+        if self.headers.get("Authorization", "") == f"Bearer {self.api_key}": return True
+        self._send(401, {"error": "unauthorized"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized(): return
+        if self.path == "/health": return self._send(200, {"ok": True})
+        if self.path == "/stats": return self._send(200, self.service.stats())
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not self._authorized(): return
+        try:
+            body = json.loads(raw or b"{}")
+            if self.path == "/search":
+                q = str(body.get("query") or "").strip()
+                if not q: return self._send(400, {"error": "query is required"})
+                return self._send(200, self.service.search_many([q], _k(body))[0])
+            if self.path == "/search_batch":
+                qs = [str(q).strip() for q in body.get("queries") or []]
+                if not qs or not all(qs): return self._send(400, {"error": "queries must be non-empty strings"})
+                return self._send(200, {"results": self.service.search_many(qs, _k(body))})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send(404, {"error": "not found"})
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 128  # 기본값 5면 동시 접속이 몰릴 때 연결이 밀려 재시도 지연(~1s)이 생김
+    daemon_threads = True
+
+def main(argv):
+    ap = argparse.ArgumentParser(description="PDF 검색 서버 (/search, /search_batch, /stats)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--persist-dir", default="chroma_store")
+    ap.add_argument("--model", default=DEFAULT_MODEL)
+    ap.add_argument("--index", nargs="*", default=[], help="시작할 때 색인할 PDF 경로들 (기존 색인은 초기화)")
+    ap.add_argument("--max-batch", type=int, default=EMBED_MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=EMBED_MAX_WAIT_MS)
+    args = ap.parse_args(argv)
+
+    store = get_store(persist_dir=args.persist_dir, model_name=args.model)
+    service = RetrieverService(store, EmbedBatcher(store.model, args.max_batch, args.max_wait_ms))
+    for i, path in enumerate(args.index):
+        n = service.index_pdf(path, reset=(i == 0))
+        print(f"[index] {path}: {n} chunks")
+    Handler.service = service
+    print(f"retriever → http://{args.host}:{args.port} (index {service.index_version()})")
+    Server((args.host, args.port), Handler).serve_forever()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
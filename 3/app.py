@@ -1,9 +1,9 @@
 import streamlit as st
-import requests
 from pypdf import PdfReader
 from sentence_transformers import SentenceTransformer
 import chromadb
 import uuid # 고유 ID 생성을 위해 추가
+from potens_client import PotensClient
 
 # --- 1. 핵심 기능 함수 정의 ---
 
@@ -23,25 +23,47 @@ def get_text_chunks(text):
     chunks = text.split('\n\n')
     return [chunk for chunk in chunks if chunk.strip()] # 내용이 있는 청크만 반환
 
-# 청크를 벡터로 변환하고 데이터베이스에 저장하는 함수
-def get_vectorstore(text_chunks):
+# 임베딩 모델과 ChromaDB 클라이언트는 서버 프로세스당 한 번만 만들어 모든 사용자가 함께 씁니다.
+# (st.cache_resource: 버튼을 누를 때마다 모델을 다시 읽지 않고, 동시에 요청돼도 한 번만 로드)
+@st.cache_resource(show_spinner="임베딩 모델을 불러오는 중입니다...")
+def load_model():
     # 무료 공개된 한국어 임베딩 모델을 사용합니다.
     # 이 모델이 문장의 '의미'를 숫자의 배열(벡터)로 바꿔줍니다.
-    model = SentenceTransformer('jhgan/ko-sroberta-multitask')
+    return SentenceTransformer('jhgan/ko-sroberta-multitask')
 
+@st.cache_resource
+def load_client():
     # ChromaDB 클라이언트를 생성합니다. (메모리에서 실행되어 간단합니다)
-    client = chromadb.Client()
+    return chromadb.Client()
 
-    # 'pdf_collection' 이라는 이름의 컬렉션(데이터 저장 공간)을 만듭니다.
-    # 만약 이미 있다면 기존 것을 사용합니다.
-    collection = client.get_or_create_collection(name="pdf_collection")
+@st.cache_resource
+def load_potens():
+    # Potens.ai 호출 클라이언트도 함께 씁니다. (연결 재사용 · 동시 호출 수 제한 · 일시 오류 재시도)
+    return PotensClient()
 
-    # 각 청크에 대해 고유 ID를 생성하고 임베딩(벡터 변환)하여 저장합니다.
-    for i, chunk in enumerate(text_chunks):
+# 청크를 벡터로 변환하고 데이터베이스에 저장하는 함수
+def get_vectorstore(text_chunks):
+    model = load_model()
+    client = load_client()
+
+    # 클라이언트를 모든 사용자가 공유하므로 컬렉션은 업로드마다 고유한 이름으로 만들고,
+    # 같은 사용자가 다시 처리하면 이전 컬렉션은 지워서 메모리가 쌓이지 않게 합니다.
+    old = st.session_state.get("collection_name")
+    if old:
+        try:
+            client.delete_collection(old)
+        except Exception:
+            pass
+    name = f"pdf_collection_{uuid.uuid4().hex}"
+    collection = client.get_or_create_collection(name=name)
+    st.session_state.collection_name = name
+
+    # 모든 청크를 한 번에 임베딩(벡터 변환)하여 고유 ID와 함께 저장합니다.
+    if text_chunks:
         collection.add(
-            embeddings=[model.encode(chunk).tolist()], # 문장을 벡터로 변환
-            documents=[chunk], # 원문 텍스트 저장
-            ids=[str(uuid.uuid4())] # 고유한 ID 부여
+            embeddings=model.encode(text_chunks).tolist(), # 문장을 벡터로 변환
+            documents=text_chunks, # 원문 텍스트 저장
+            ids=[str(uuid.uuid4()) for _ in text_chunks] # 고유한 ID 부여
         )
     return collection, model
 
@@ -61,10 +83,6 @@ def search_similar_chunks(collection, model, user_question):
 def get_ai_answer(context, question, api_key):
     # Potens.ai API 엔드포인트와 헤더 정보
     url = "https://ai.potens.ai/api/chat"
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {api_key}'
-    }
 
     # *** 가장 중요한 부분: 프롬프트 엔지니어링 ***
     # AI가 답변을 지어내지 않고, 반드시 주어진 내용에서 '발췌'하도록 강제하는 명령
@@ -86,16 +104,14 @@ def get_ai_answer(context, question, api_key):
     [답변]
     """
 
-    data = {"prompt": prompt}
+    # API에 요청 보내기 (공용 클라이언트: 연결 재사용 + 재시도)
+    result = load_potens().call(url, prompt, api_key=api_key)
 
-    # API에 요청 보내기
-    response = requests.post(url, headers=headers, json=data)
-    
     # 응답 결과 처리
-    if response.status_code == 200:
-        return response.json().get("choices")[0].get("message").get("content")
+    if result["ok"]:
+        return result["text"]
     else:
-        return f"API 호출에 실패했습니다: {response.status_code} - {response.text}"
+        return f"API 호출에 실패했습니다: {result['status'] or result['error']} - {result['text']}"
 
 
 # --- 2. Streamlit 웹 앱 화면 구성 ---
@@ -2,8 +2,8 @@
 import os
 import streamlit as st
 import tempfile
-from rag import extract_pages, chunk_text, VectorStore, build_extract_only_answer
-import requests
+from rag import extract_pages, chunk_text, get_store, build_extract_only_answer
+from potens_client import PotensClient
 
 st.set_page_config(page_title="PDF 발췌 RAG", layout="wide")
 
@@ -23,9 +23,14 @@ with st.sidebar:
     if use_potens and not pot_key:
         st.warning("⚠️ Streamlit Secrets에 POTENS_API_KEY 를 넣어주세요.")
 
-# --- 전역: 벡터 스토어 준비 ---
+# --- 전역: 벡터 스토어 준비 (프로세스 공용, 모델은 최초 1회만 로드) ---
 VS_DIR = "chroma_store"
-vs = VectorStore(persist_dir=VS_DIR)
+vs = get_store(persist_dir=VS_DIR)
+
+@st.cache_resource
+def load_potens():
+    # 포텐스 호출 클라이언트도 프로세스 공용 (연결 재사용 · 동시 호출 수 제한 · 일시 오류 재시도)
+    return PotensClient()
 
 # 인덱싱 단계
 if uploaded and build_index:
@@ -39,7 +44,7 @@ if uploaded and build_index:
 
     with st.status("청크 분할 및 임베딩 중...", expanded=False):
         chunks = chunk_text(pages, max_chars=1200, overlap=200)
-        vs.add_chunks(pdf_id=os.path.basename(tmp_path), chunks=chunks)
+        vs.add_chunks(pdf_id=uploaded.name, chunks=chunks)  # 검색 결과 doc_id = 원래 파일명
 
     st.success(f"인덱스 완료! 총 {len(chunks)}개 청크를 추가했습니다.")
     os.remove(tmp_path)
@@ -79,20 +84,10 @@ if st.button("검색 실행"):
 [검색 발췌]
 {answer}
 """
-            try:
-                res = requests.post(
-                    pot_endpoint,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {st.secrets['POTENS_API_KEY']}"
-                    },
-                    json={"prompt": prompt},
-                    timeout=60
-                )
-                res.raise_for_status()
-                out = res.json()
-                # API 응답 포맷에 맞게 수정 필요할 수 있음 (샘플)
-                llm_text = out.get("text") or out.get("response") or str(out)
-                st.code(llm_text, language="markdown")
-            except Exception as e:
-                st.error(f"포텐스 API 호출 실패: {e}")
+            res = load_potens().call(pot_endpoint, prompt, api_key=pot_key, timeout=60)
+            if res["ok"]:
+                # 응답 포맷별 본문 키 탐색은 potens_client.response_text 참고
+                st.code(res["text"], language="markdown")
+                st.caption(f"포텐스 응답 {res['elapsed']:.1f}s")
+            else:
+                st.error(f"포텐스 API 호출 실패: {res['error'] or (str(res['status']) + ' ' + res['reason'])}")
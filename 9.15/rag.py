@@ -1,6 +1,8 @@
 # rag.py
 import os
 import re
+import hashlib
+import threading
 import fitz  # PyMuPDF
 import numpy as np
 from typing import List, Dict, Tuple
@@ -22,20 +24,29 @@ def extract_pages(pdf_path: str) -> List[Dict]:
 
 # -------- 문장/문단 기반 청크 --------
 def chunk_text(pages: List[Dict], max_chars=1200, overlap=200) -> List[Dict]:
+    """청크: {"page", "content", "line_start", "line_end"} — 줄 번호는 페이지 안에서 1부터"""
     chunks = []
     for p in pages:
         text = p["text"]
         # 문단 단위 분할 → 길면 슬라이딩 윈도로 추가 분할
-        paras = [t.strip() for t in text.split("\n\n") if t.strip()]
-        for para in paras:
+        pos = 0
+        for raw in text.split("\n\n"):
+            offset, pos = pos, pos + len(raw) + 2
+            para = raw.strip()
+            if not para:
+                continue
+            first = text.count("\n", 0, offset + len(raw) - len(raw.lstrip())) + 1  # 문단 첫 줄 번호
+            line_of = lambda i: first + para.count("\n", 0, i)
             if len(para) <= max_chars:
-                chunks.append({"page": p["page"], "content": para})
+                chunks.append({"page": p["page"], "content": para,
+                               "line_start": first, "line_end": line_of(len(para))})
             else:
                 start = 0
                 while start < len(para):
                     end = min(start + max_chars, len(para))
                     chunk = para[start:end]
-                    chunks.append({"page": p["page"], "content": chunk})
+                    chunks.append({"page": p["page"], "content": chunk,
+                                   "line_start": line_of(start), "line_end": line_of(end - 1)})
                     if end == len(para):
                         break
                     start = end - overlap
@@ -52,39 +63,83 @@ def clean_sentence_edges(text: str) -> str:
     text = re.sub(r'[\-\s•·]+$', '', text)
     return text
 
+# -------- 공용 레지스트리: 모델/스토어를 프로세스당 한 번만 로드 --------
+# Streamlit은 위젯을 누를 때마다 app.py를 다시 실행하지만 모듈(rag)은 한 번만 import되므로,
+# 여기 보관한 객체는 모든 재실행·세션이 공유한다. 같은 키는 동시에 요청돼도 한 번만 만든다.
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+_MODELS: Dict[str, SentenceTransformer] = {}
+_STORES: Dict[Tuple[str, str], "VectorStore"] = {}
+_KEY_LOCKS: Dict[tuple, threading.Lock] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def _load_once(cache: dict, key, factory):
+    obj = cache.get(key)
+    if obj is not None:
+        return obj
+    with _REGISTRY_LOCK:
+        lock = _KEY_LOCKS.setdefault((id(cache), key), threading.Lock())
+    with lock:  # 키별 잠금: 다른 모델 로딩은 막지 않음
+        if key not in cache:
+            cache[key] = factory()
+        return cache[key]
+
+def get_model(model_name: str = DEFAULT_MODEL) -> SentenceTransformer:
+    return _load_once(_MODELS, model_name, lambda: SentenceTransformer(model_name))
+
+def get_store(persist_dir: str = "chroma_store", model_name: str = DEFAULT_MODEL) -> "VectorStore":
+    key = (os.path.abspath(persist_dir), model_name)
+    return _load_once(_STORES, key, lambda: VectorStore(persist_dir=persist_dir, model_name=model_name))
+
 # -------- 임베딩 & Chroma --------
 class VectorStore:
-    def __init__(self, persist_dir: str = "chroma_store", model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, persist_dir: str = "chroma_store", model_name: str = DEFAULT_MODEL):
         self.persist_dir = persist_dir
+        self._lock = threading.RLock()  # 세션 간 공유되므로 컬렉션 교체/추가는 직렬화
         os.makedirs(persist_dir, exist_ok=True)
         self.client = chromadb.Client(Settings(
             chroma_db_impl="duckdb+parquet",
             persist_directory=persist_dir
         ))
         self.collection = self.client.get_or_create_collection(name="pdf_chunks")
-        self.model = SentenceTransformer(model_name)
+        self.model = get_model(model_name)
+        self.version = 0  # reset/add마다 증가 — 검색 서버가 X-Index-Version으로 알림
 
     def reset(self):
-        try:
-            self.client.delete_collection("pdf_chunks")
-        except Exception:
-            pass
-        self.collection = self.client.get_or_create_collection(name="pdf_chunks")
+        with self._lock:
+            try:
+                self.client.delete_collection("pdf_chunks")
+            except Exception:
+                pass
+            self.collection = self.client.get_or_create_collection(name="pdf_chunks")
+            self.version += 1
 
     def add_chunks(self, pdf_id: str, chunks: List[Dict]):
+        """
+        pdf_id(표시용 문서 이름)의 청크를 색인. 같은 이름으로 이미 색인된 청크는 먼저 지운다(개정본 재업로드).
+        id에 본문 해시를 넣어 같은 이름이라도 내용이 다르면 id가 달라지게 함 (Chroma는 중복 id를 경고만 하고 무시)
+        """
         texts = [c["content"] for c in chunks]
-        metadatas = [{"page": c["page"], "pdf_id": pdf_id} for c in chunks]
-        ids = [f"{pdf_id}_{i}" for i in range(len(chunks))]
+        metadatas = [{"page": c["page"], "pdf_id": pdf_id,
+                      **{key: c[key] for key in ("line_start", "line_end") if c.get(key) is not None}} for c in chunks]
+        ids = [f"{pdf_id}_{i}_{hashlib.sha1(t.encode('utf-8')).hexdigest()[:12]}" for i, t in enumerate(texts)]
         embeddings = self.model.encode(texts, convert_to_numpy=True).tolist()
-        self.collection.add(documents=texts, metadatas=metadatas, ids=ids, embeddings=embeddings)
-        self.client.persist()
+        with self._lock:
+            self.collection.delete(where={"pdf_id": pdf_id})
+            self.collection.add(documents=texts, metadatas=metadatas, ids=ids, embeddings=embeddings)
+            self.client.persist()
+            self.version += 1
 
     def query(self, q: str, k: int = 8) -> List[Dict]:
         q_emb = self.model.encode([q], convert_to_numpy=True).tolist()
-        res = self.collection.query(query_embeddings=q_emb, n_results=k)
+        return self.query_embedding(q_emb[0], k=k)
+
+    def query_embedding(self, emb: List[float], k: int = 8) -> List[Dict]:
+        """이미 임베딩한 질의로 검색 (검색 서버는 여러 질의를 모아 한 번에 encode한 뒤 이걸 부름)"""
+        res = self.collection.query(query_embeddings=[emb], n_results=k)
         results = []
-        for doc, meta in zip(res["documents"][0], res["metadatas"][0]):
-            results.append({"content": doc, "page": meta.get("page"), "pdf_id": meta.get("pdf_id")})
+        for cid, doc, meta in zip(res["ids"][0], res["documents"][0], res["metadatas"][0]):
+            results.append({"id": cid, "content": doc, "page": meta.get("page"), "pdf_id": meta.get("pdf_id"),
+                            "line_start": meta.get("line_start"), "line_end": meta.get("line_end")})
         return results
 
 # -------- 검색 결과를 "발췌" 답변으로 정리 --------
@@ -1,17 +1,19 @@
 # app.py
 # Hi-PolicyLens | Streamlit 버전
 # - RSS 목록 → 원문 텍스트 추출 → Potens.AI 정규화(JSON) → 테이블 + 요약 탭
-# - "검색(빠름)"은 RSS만, "모두 요약"은 문서별 순차 요약(안전모드)
-# - 세션 내에서 직전 실행과의 간단 diff도 제공
+# - "검색(빠름)"은 RSS만, "모두 요약"은 문서별 병렬 요약(동시 처리 수 + Potens 호출률 제한)
+# - 실행 결과를 스냅샷으로 저장하고, 두 스냅샷 간 변화 리포트(diff) 제공
 
-import os
-import json
 import time
-import requests
-import feedparser
 import streamlit as st
-from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+
+from fetcher import CONTENT_CACHE
+from normalizer import NORM_CACHE, POTENS_CALLER
+from resilience import stats_text
+from pipeline import summarize_all, summarize_row, progress_text, ingest_summary
+from sources import collect_sources, SOURCE_TIMEOUT, COLLECT_DEADLINE, FEED_CACHE
+from snapshots import SNAPSHOTS, BATCH_LABEL
+from search import SEARCH_INDEX, parse_date
 
 # -----------------------------
 # 페이지 설정 & 기본 스타일
@@ -44,124 +46,17 @@ hr {{ border-color:#eee }}
 </style>
 """, unsafe_allow_html=True)
 
-# -----------------------------
-# 설정 (API 키)
-# -----------------------------
-POTENS_API_KEY = st.secrets.get("POTENS_API_KEY", os.getenv("POTENS_API_KEY", "PUT_YOUR_POTENS_API_KEY_HERE"))
-POTENS_ENDPOINT = st.secrets.get("POTENS_ENDPOINT", os.getenv("POTENS_ENDPOINT", "https://ai.potens.ai/api/chat"))
-
 # -----------------------------
 # 유틸
 # -----------------------------
 SECTORS = ["solar","wind","hydro","nuclear"]
 SECTOR_LABELS = {"solar":"태양광", "wind":"풍력", "hydro":"수력", "nuclear":"원자력"}
+REGIONS = ["아시아","북미","유럽"]
+PERIODS = {0:"전체 기간", 7:"최근 7일", 30:"최근 30일", 90:"최근 90일", 365:"최근 1년"}
 
-def region_from_url(url: str) -> str:
-  try:
-    host = urlparse(url).hostname or ""
-    if host.endswith("cbp.gov"): return "북미"
-    if host.endswith("motie.go.kr"): return "아시아"
-    if host.endswith("europa.eu"): return "유럽"
-  except:
-    pass
-  return ""
-
-def html_to_text(html: str) -> str:
-  soup = BeautifulSoup(html or "", "html.parser")
-  for t in soup(["script", "style", "noscript"]): t.extract()
-  text = soup.get_text(separator=" ")
-  return " ".join(text.split())
-
-def fetch_html(url: str, timeout=20) -> str:
-  try:
-    r = requests.get(url, timeout=timeout, allow_redirects=True, headers={"User-Agent":"Hi-PolicyLens/Streamlit"})
-    if r.status_code >= 200 and r.status_code < 300:
-      r.encoding = r.apparent_encoding or r.encoding
-      return r.text
-  except:
-    return ""
-  return ""
-
-def extract_json_array(s: str):
-  if not s: return None
-  t = s.strip().replace("```json","").replace("```","").strip()
-  i, j = t.find("["), t.rfind("]")
-  if i!=-1 and j!=-1 and j>i:
-    try:
-      arr = json.loads(t[i:j+1])
-      return arr if isinstance(arr, list) else None
-    except: pass
-  try:
-    arr = json.loads(t)
-    return arr if isinstance(arr, list) else None
-  except: return None
-
-def build_prompt(text: str, origin: str) -> str:
-  clipped = (text or "")[:6000]
-  return f"""역할: 국제 규제 분석가
-목표: 아래 원문에서 "신재생에너지 관련 규제"만 추출하여 JSON 배열로 정규화.
-
-스키마:
-[
-  {{
-    "jurisdiction": "국가/기관/지역",
-    "law_or_policy": "법/정책/지침 명",
-    "effective_date": "YYYY-MM-DD 또는 미상",
-    "requirements": ["핵심 요건1","핵심 요건2"],
-    "reporting": "보고/신고 주기 또는 방식(미상이면 'N/A')",
-    "incentives": ["세제/보조 등"],
-    "penalties": ["미이행시 제재"],
-    "source": "원문 URL"
-  }}
-]
-
-[원문 출처] {origin}
-[원문]
-{clipped}
-
-반드시 **순수한 유효 JSON 배열([])**만 출력하세요.
-- 마크다운/설명/코드펜스/주석/텍스트 금지
-- JSON 외 문자를 포함하지 말 것
-- 불확실하면 빈 배열([]) 반환"""
-
-def normalize_with_ai(text: str, origin_url: str):
-  if not POTENS_API_KEY or POTENS_API_KEY.startswith("PUT_"):
-    # 키 미설정 시 폴백: 빈 배열
-    return []
-  prompt = build_prompt(text, origin_url)
-  try:
-    r = requests.post(
-      POTENS_ENDPOINT,
-      headers={"Authorization": f"Bearer {POTENS_API_KEY}", "Content-Type":"application/json", "Accept":"application/json"},
-      json={"prompt": prompt},
-      timeout=40,
-    )
-    body = r.text or ""
-    if r.headers.get("content-type","").startswith("application/json"):
-      try:
-        j = r.json()
-        body = j.get("response") or j.get("text") or j.get("content") or body
-      except: pass
-  except Exception as e:
-    return []
-  arr = extract_json_array(body) or []
-  # 정규화
-  out = []
-  for it in arr:
-    out.append({
-      "jurisdiction": it.get("jurisdiction",""),
-      "law_or_policy": it.get("law_or_policy",""),
-      "effective_date": it.get("effective_date","N/A"),
-      "requirements": it.get("requirements",[]) if isinstance(it.get("requirements",[]), list) else [],
-      "reporting": it.get("reporting","N/A"),
-      "incentives": it.get("incentives",[]) if isinstance(it.get("incentives",[]), list) else [],
-      "penalties": it.get("penalties",[]) if isinstance(it.get("penalties",[]), list) else [],
-      "source": it.get("source", origin_url)
-    })
-  return out
-
-def key_of(item: dict) -> str:
-  return f"{item.get('jurisdiction','')}|{item.get('law_or_policy','')}"
+DIFF_SHOW = 200       # 변화 리포트 열별 최대 표시 건수
+LIST_PAGE_SIZE = 15   # 개요 목록 한 페이지 행 수
+TABLE_PAGE_SIZE = 50  # 요약 결과 표 한 페이지 행 수
 
 # -----------------------------
 # RSS (빠름)
@@ -172,28 +67,18 @@ DEFAULT_FEEDS = [
   "https://echa.europa.eu/documents/10162/21645696/rss.xml",
 ]
 
-def fetch_feed_list(feed_urls, query: str):
-  entries = []
-  for url in feed_urls:
-    try:
-      feed = feedparser.parse(url)
-      for e in feed.entries:
-        if not getattr(e, "title", None) or not getattr(e, "link", None):
-          continue
-        entries.append({
-          "title": e.title,
-          "link": e.link,
-          "pubDate": getattr(e, "published", "") or getattr(e,"updated",""),
-          "source": url,
-          "region": region_from_url(e.link),
-        })
-    except:
-      pass
-  # 필터 & 정렬 & 상한
-  q = (query or "").lower().strip()
-  if q:
-    entries = [x for x in entries if q in x["title"].lower()]
-  entries.sort(key=lambda x: str(x["pubDate"]), reverse=True)
+def fetch_feed_list(feed_urls, query: str, regions=None, days=0):
+  # 피드 전체를 병렬 수집(피드별 타임아웃 + 전체 마감) → 느린 기관은 기다리지 않고 부분 결과 사용
+  sources = [{"type":"rss", "url":url} for url in feed_urls]
+  entries, statuses = collect_sources(sources, timeout=SOURCE_TIMEOUT, deadline=COLLECT_DEADLINE)
+  st.session_state["source_status"] = statuses
+  SEARCH_INDEX.add_entries(entries)  # 수집 이력 누적 색인
+  # 키워드/지역/기간 필터는 누적 색인에서 검색(과거 수집 항목 포함, 점수 순)
+  if (query or "").strip() or regions or days:
+    since = time.time() - days*86400 if days else None
+    return SEARCH_INDEX.search(query, regions=regions, since=since, limit=40)
+  # 정렬 & 상한
+  entries.sort(key=lambda x: parse_date(x["pubDate"]) or 0, reverse=True)  # RSS(RFC 822)·크롤러(ISO) 날짜 혼재
   return entries[:40]
 
 # -----------------------------
@@ -201,13 +86,29 @@ def fetch_feed_list(feed_urls, query: str):
 # -----------------------------
 if "list_rows" not in st.session_state: st.session_state["list_rows"] = []
 if "normalized_rows" not in st.session_state: st.session_state["normalized_rows"] = []  # 이번 실행 결과(정규화 아이템들)
-if "prev_normalized_rows" not in st.session_state: st.session_state["prev_normalized_rows"] = []  # 직전 실행 결과(세션 내)
+if "snapshot_id" not in st.session_state: st.session_state["snapshot_id"] = None  # 이번 결과가 저장된 스냅샷
+if "row_items" not in st.session_state: st.session_state["row_items"] = {}  # 링크 → 그 문서의 정규화 아이템 (목록 행 표시용)
+if "source_status" not in st.session_state: st.session_state["source_status"] = []  # 마지막 수집의 피드별 상태
+
+# 배치 실행(09.05/batch.py, 같은 DATA_DIR) 결과가 있으면 새 세션 첫 화면에 바로 표시 (요청 중 수집/정규화 없음)
+if "batch_loaded" not in st.session_state:
+  st.session_state["batch_loaded"] = True
+  snap = SNAPSHOTS.latest(BATCH_LABEL)
+  if snap and snap["meta"].get("rows"):
+    st.session_state["list_rows"] = snap["meta"]["rows"]
+    st.session_state["normalized_rows"] = SNAPSHOTS.load(snap["id"])
+    for it in st.session_state["normalized_rows"]:
+      st.session_state["row_items"].setdefault(it.get("link"), []).append(it)
+    st.session_state["snapshot_id"] = snap["id"]
+    st.session_state["batch_at"] = snap["created_at"]
 
 # -----------------------------
 # 헤더
 # -----------------------------
 st.title("Hi-PolicyLens")
 st.caption("국내외 규제 차이를 체계적으로 비교하여 투자 리스크를 분석합니다.")
+if st.session_state.get("batch_at") and st.session_state["snapshot_id"]:
+  st.caption(f"🗓 배치 실행 결과 표시 중 ({time.strftime('%Y-%m-%d %H:%M', time.localtime(st.session_state['batch_at']))} 기준) — 최신 목록은 [검색(빠름)]")
 
 # -----------------------------
 # 툴바
@@ -216,33 +117,159 @@ col1, col2, col3, col4 = st.columns([1,2,1,1])
 with col1:
   sector = st.selectbox("섹터", SECTORS, index=0, format_func=lambda s: SECTOR_LABELS.get(s,s))
 with col2:
-  query = st.text_input("필터 키워드(예: renewable, RPS, FIT 등)", value="")
+  query = st.text_input("필터 키워드(예: renewable, RPS, FIT 등)", value="", help="공백 = AND, OR 또는 | = OR (예: 태양광 관세 OR tariff)")
 with col3:
   run_btn = st.button("검색(빠름)", use_container_width=True)
 with col4:
   reset_btn = st.button("초기화", use_container_width=True)
 
+fcol1, fcol2 = st.columns([3,1])
+with fcol1:
+  regions = st.multiselect("지역", REGIONS, default=[])
+with fcol2:
+  days = st.selectbox("게시일", list(PERIODS), index=0, format_func=PERIODS.get)
+
 st.divider()
 
 # -----------------------------
 # 동작: 검색(빠름)
 # -----------------------------
 if run_btn:
-  st.session_state["prev_normalized_rows"] = st.session_state.get("normalized_rows", []).copy()
   st.session_state["normalized_rows"] = []  # 이번 실행 결과 초기화
+  st.session_state["row_items"] = {}
+  st.session_state["list_page"] = st.session_state["table_page"] = 1
   with st.spinner("RSS 목록 가져오는 중…"):
     feed_urls = DEFAULT_FEEDS  # 필요 시 섹터별로 다르게 구성 가능
-    rows = fetch_feed_list(feed_urls, query)
+    rows = fetch_feed_list(feed_urls, query, regions, days)
     st.session_state["list_rows"] = rows
+  # 피드별 수집 상태 (지연/오류 피드는 이번 목록에서 빠짐)
+  for s in st.session_state["source_status"]:
+    if s["status"] == "ok": continue
+    st.warning(f"{s['url']} → {'시간 초과' if s['status']=='timeout' else '오류'}: {s['error']}")
+  cs = FEED_CACHE.stats
+  st.caption(f"피드 캐시: 신선 {cs['fresh']} · 304 재검증 {cs['revalidated']} · 새로 받음 {cs['miss']} · 오래된 캐시 {cs['stale']}")
 
 if reset_btn:
   st.session_state["list_rows"] = []
   st.session_state["normalized_rows"] = []
-  st.session_state["prev_normalized_rows"] = []
+  st.session_state["row_items"] = {}
+  st.session_state["snapshot_id"] = None
 
 # -----------------------------
 # 탭
 # -----------------------------
+def paginate(items, page_size, key):
+  """서버 측 페이지 나누기: 페이지 선택 위젯을 그리고 현재 페이지 조각과 시작 인덱스를 반환."""
+  pages = max(1, -(-len(items) // page_size))
+  if st.session_state.get(key, 1) > pages: st.session_state[key] = 1
+  page = st.number_input(f"페이지 (총 {pages}쪽 · {len(items)}건)", min_value=1, max_value=pages, key=key) if pages > 1 else 1
+  start = (page - 1) * page_size
+  return items[start:start+page_size], start
+
+# 아래 fragment들은 자기 안의 위젯(페이지/스냅샷 선택)이 눌리면 그 부분만 다시 실행된다
+# (개별 요약은 다른 탭의 결과 표도 바꾸므로 앱 전체를 다시 실행)
+@st.fragment
+def doc_list(rows):
+  # 표 형태로 리스트 + 개별 요약 버튼 (현재 페이지만 렌더)
+  page_rows, start = paginate(rows, LIST_PAGE_SIZE, "list_page")
+  row_items = st.session_state["row_items"]
+  for i, r in enumerate(page_rows, start):
+    with st.container():
+      c1, c2, c3, c4, c5 = st.columns([1,1,4,3,1])
+      c2.markdown(f"<span class='chip'>{r['region'] or ''}</span>", unsafe_allow_html=True)
+      c3.write(r["title"])
+      sum_key = f"sum_{i}"
+      if c4.button("요약", key=sum_key):
+        with st.spinner("요약/정규화 중…"):
+          items = summarize_row(r)
+          # 세션 결과에서 이 행의 이전 요약을 교체 (같은 행을 다시 눌러도 중복되지 않게)
+          st.session_state["normalized_rows"] = [n for n in st.session_state["normalized_rows"] if n.get("link") != r["link"]] + items
+          row_items[r["link"]] = items
+        st.rerun(scope="app")  # 요약/비교 탭의 결과 표도 함께 갱신
+      items = row_items.get(r["link"])
+      if items:
+        # 요약된 행은 국가/관할과 정책명을 바로 표시
+        c1.markdown(f"**{items[0].get('jurisdiction') or 'N/A'}**")
+        c4.caption(f"✅ {len(items)}개: " + ", ".join(it.get("law_or_policy") or "N/A" for it in items)[:120])
+      else:
+        c1.markdown("**N/A**")  # 요약 전이라 국가/관할은 비움
+      c5.markdown(f"<a class='btn-link' href='{r['link']}' target='_blank'>원문</a>", unsafe_allow_html=True)
+    st.markdown("<hr/>", unsafe_allow_html=True)
+
+@st.fragment
+def summary_table():
+  # 1) 요약 결과 테이블 (현재 페이지만 구성)
+  norm = st.session_state.get("normalized_rows", [])
+  st.markdown("#### 요약/정규화 결과")
+  if not norm:
+    st.info("아직 요약/정규화된 데이터가 없습니다. 개요 탭에서 [요약] 또는 [모두 요약]을 실행하세요.")
+    return
+  page_norm, _ = paginate(norm, TABLE_PAGE_SIZE, "table_page")
+  table_rows = []
+  for n in page_norm:
+    table_rows.append({
+      "국가/관할": n.get("jurisdiction") or "N/A",
+      "지역": n.get("region") or "",
+      "보고서 제목": n.get("law_or_policy") or (n.get("title") or "N/A"),
+      "주요 규제 요건": "; ".join(n.get("requirements") or []),
+      "발효일": n.get("effective_date") or "N/A",
+      "보고": n.get("reporting") or "N/A",
+      "원문": n.get("source") or n.get("link") or ""
+    })
+  st.dataframe(table_rows, use_container_width=True, height=min(560, 40+28*len(table_rows)))
+
+@st.fragment
+def change_report():
+  # 2) 스냅샷 간 변화 리포트 (실행 결과는 영속 저장, diff는 필드 해시 비교로 1회 계산 후 캐시)
+  labels = SNAPSHOTS.labels()
+  if sum(n for _, n in labels) >= 2:
+    st.markdown("#### 변화 리포트 (스냅샷 비교)")
+    counts = dict(labels)
+    kind = st.selectbox("스냅샷 종류", ["전체"] + list(counts), key="snap_kind",
+                        format_func=lambda l: l if l == "전체" else f"{l} ({counts[l]}개)")
+    snaps = SNAPSHOTS.list(label=None if kind == "전체" else kind)  # 개수 제한 없이 전체 기록
+    by_id = {sn["id"]: sn for sn in snaps}
+    ids = list(by_id)
+    def snap_label(i):
+      sn = by_id[i]
+      return f"#{i} · {time.strftime('%m-%d %H:%M', time.localtime(sn['created_at']))} · {sn['size']}건 {sn['label']}"
+    cur = st.session_state.get("snapshot_id")
+    sc1, sc2 = st.columns(2)
+    with sc1:
+      b = st.selectbox("이후", ids, index=ids.index(cur) if cur in by_id else 0, format_func=snap_label)
+    older = [i for i in ids if i < b]
+    with sc2:
+      a = st.selectbox("이전", older, format_func=snap_label) if older else None
+
+    if a is None:
+      st.info("선택한 스냅샷보다 이전 스냅샷이 없습니다.")
+    else:
+      d = SNAPSHOTS.diff(a, b)
+      added, updated, removed = d["added"], d["updated"], d["removed"]
+      st.caption(f"신규 {len(added)} · 변경 {len(updated)} · 삭제 {len(removed)}")
+      colA, colB, colC = st.columns(3)
+      with colA:
+        st.write("**신규**")
+        if not added: st.write("없음")
+        for it in added[:DIFF_SHOW]:
+          st.markdown(f"- **{it.get('jurisdiction') or 'N/A'} · {it.get('law_or_policy') or 'N/A'}**")
+        if len(added) > DIFF_SHOW: st.caption(f"외 {len(added)-DIFF_SHOW}건")
+      with colB:
+        st.write("**변경**")
+        if not updated: st.write("없음")
+        for ch in updated[:DIFF_SHOW]:
+          st.markdown(f"- **{ch['after'].get('jurisdiction') or 'N/A'} · {ch['after'].get('law_or_policy') or 'N/A'}**")
+          for c in ch["changes"]:
+            st.markdown(f"  - {c['field']}: :red[`{str(c['before'])[:80]}`] → :green[`{str(c['after'])[:80]}`]")
+        if len(updated) > DIFF_SHOW: st.caption(f"외 {len(updated)-DIFF_SHOW}건")
+      with colC:
+        st.write("**삭제**")
+        if not removed: st.write("없음")
+        for it in removed[:DIFF_SHOW]:
+          st.markdown(f"- **{it.get('jurisdiction') or 'N/A'} · {it.get('law_or_policy') or 'N/A'}**")
+        if len(removed) > DIFF_SHOW: st.caption(f"외 {len(removed)-DIFF_SHOW}건")
+
+
 tab1, tab2 = st.tabs(["개요", "요약/비교"])
 
 with tab1:
@@ -252,150 +279,37 @@ with tab1:
   if not rows:
     st.info("검색(빠름)을 먼저 실행하세요.")
   else:
-    # 목록 렌더
-    cols = ["국가/관할","지역","제목","요약","원문"]
     st.write("")
-    container = st.container()
-    all_btn_col = st.columns([1,4,1,1,1])[2]
-    with all_btn_col:
+    btn_cols = st.columns([1,4,1,1,1])
+    with btn_cols[2]:
       all_sum = st.button("모두 요약(안전모드)", type="primary")
+    with btn_cols[3]:
+      incremental = st.checkbox("증분 모드", value=True, help="지난 실행 이후 새로 올라왔거나 내용이 바뀐 문서만 다운로드/정규화합니다.")
     if all_sum:
+      # 병렬 요약: 끝나는 문서부터 normalized_rows에 바로 누적
       prog = st.progress(0, text="모두 요약 중…")
-      norm_all = []
-      for i, r in enumerate(rows):
-        html = fetch_html(r["link"])
-        text = html_to_text(html)[:6000]
-        items = normalize_with_ai(text, r["link"])
-        # 정규화 없는 경우 폴백으로 제목 기반 최소 항목
-        if not items:
-          items = [{
-            "jurisdiction": "",
-            "law_or_policy": r["title"],
-            "effective_date": "N/A",
-            "requirements": [],
-            "reporting": "N/A",
-            "incentives": [],
-            "penalties": [],
-            "source": r["link"]
-          }]
-        # 세션에 누적
-        for it in items:
-          norm_all.append({
-            **it,
-            "region": r["region"],
-            "link": r["link"],
-            "title": r["title"]
-          })
-        prog.progress((i+1)/len(rows))
-        time.sleep(0.2)  # 과도한 호출 방지용 살짝 딜레이
+      st.session_state["normalized_rows"] = []
+      by_row = {}
+      for i, items, p in summarize_all(rows, incremental=incremental):
+        by_row[i] = items
+        st.session_state["normalized_rows"].extend(items)
+        prog.progress(p["done"]/p["total"], text=progress_text(p))
+      # 최종 결과는 목록 순서대로 정렬
+      norm_all = [it for i in sorted(by_row) for it in by_row[i]]
       st.session_state["normalized_rows"] = norm_all
-      st.success(f"요약/정규화 완료: {len(norm_all)}개 아이템")
-    # 표 형태로 리스트 + 개별 요약 버튼
-    for i, r in enumerate(rows):
-      with st.container():
-        c1, c2, c3, c4, c5 = st.columns([1,1,4,3,1])
-        c1.markdown("**N/A**")  # 요약 전이라 국가/관할은 비움
-        c2.markdown(f"<span class='chip'>{r['region'] or ''}</span>", unsafe_allow_html=True)
-        c3.write(r["title"])
-        sum_key = f"sum_{i}"
-        if c4.button("요약", key=sum_key):
-          with st.spinner("요약/정규화 중…"):
-            html = fetch_html(r["link"])
-            text = html_to_text(html)[:6000]
-            items = normalize_with_ai(text, r["link"])
-            if not items:
-              items = [{
-                "jurisdiction": "",
-                "law_or_policy": r["title"],
-                "effective_date": "N/A",
-                "requirements": [],
-                "reporting": "N/A",
-                "incentives": [],
-                "penalties": [],
-                "source": r["link"]
-              }]
-            # 세션에 누적
-            for it in items:
-              st.session_state["normalized_rows"].append({
-                **it,
-                "region": r["region"],
-                "link": r["link"],
-                "title": r["title"]
-              })
-            st.success(f"요약 완료 ({len(items)}개)")
-        c5.markdown(f"<a class='btn-link' href='{r['link']}' target='_blank'>원문</a>", unsafe_allow_html=True)
-      st.markdown("<hr/>", unsafe_allow_html=True)
+      st.session_state["row_items"] = {rows[i]["link"]: items for i, items in by_row.items()}
+      st.session_state["snapshot_id"] = SNAPSHOTS.save(norm_all, label="모두 요약")
+      st.success(f"요약/정규화 완료: {len(norm_all)}개 아이템 — {ingest_summary(p)}")
+      cs, ns = CONTENT_CACHE.stats, NORM_CACHE.stats
+      st.caption(f"원문 캐시: 메모리 {cs['mem_hit']} · 디스크 {cs['disk_hit']} · 다운로드 {cs['miss']} | "
+                 f"정규화 캐시: 적중 {ns['hit']} · API 호출 {ns['miss']} · 절약 {ns['saved_sec']:.0f}초")
+      st.caption(stats_text(POTENS_CALLER))
+    doc_list(rows)
 
 with tab2:
   st.subheader("요약 결과 / 비교")
-  norm = st.session_state.get("normalized_rows", [])
-  prev = st.session_state.get("prev_normalized_rows", [])
-
-  # 1) 요약 결과 테이블
-  if not norm:
-    st.info("아직 요약/정규화된 데이터가 없습니다. 개요 탭에서 [요약] 또는 [모두 요약]을 실행하세요.")
-  else:
-    st.markdown("#### 요약/정규화 결과")
-    table_rows = []
-    for n in norm:
-      table_rows.append({
-        "국가/관할": n.get("jurisdiction") or "N/A",
-        "지역": n.get("region") or "",
-        "보고서 제목": n.get("law_or_policy") or (n.get("title") or "N/A"),
-        "주요 규제 요건": "; ".join(n.get("requirements") or []),
-        "발효일": n.get("effective_date") or "N/A",
-        "보고": n.get("reporting") or "N/A",
-        "원문": n.get("source") or n.get("link") or ""
-      })
-    st.dataframe(table_rows, use_container_width=True, height=min(560, 40+28*len(table_rows)))
-
-  # 2) 직전 실행과 간단 diff(세션 한정)
-  if prev and norm:
-    st.markdown("#### 변화 리포트 (이번 실행 vs 직전 실행)")
-    # 맵 구성
-    def to_map(arr):
-      m = {}
-      for it in arr:
-        k = key_of(it)
-        m[k] = it
-      return m
-    A = to_map(prev)
-    B = to_map(norm)
-    added, removed, updated = [], [], []
-    for k, v in B.items():
-      if k not in A:
-        added.append(v)
-      else:
-        changes = []
-        fields = ["effective_date","reporting","requirements","incentives","penalties","law_or_policy"]
-        for f in fields:
-          av = json.dumps(A[k].get(f,""), ensure_ascii=False)
-          bv = json.dumps(v.get(f,""), ensure_ascii=False)
-          if av != bv:
-            changes.append({"field": f, "before": A[k].get(f,""), "after": v.get(f,"")})
-        if changes: updated.append({"after": v, "before": A[k], "changes": changes})
-    for k, v in A.items():
-      if k not in B: removed.append(v)
-
-    st.caption(f"신규 {len(added)} · 변경 {len(updated)} · 삭제 {len(removed)}")
-    colA, colB, colC = st.columns(3)
-    with colA:
-      st.write("**신규**")
-      if not added: st.write("없음")
-      for it in added:
-        st.markdown(f"- **{it.get('jurisdiction') or 'N/A'} · {it.get('law_or_policy') or 'N/A'}**")
-    with colB:
-      st.write("**변경**")
-      if not updated: st.write("없음")
-      for ch in updated:
-        st.markdown(f"- **{ch['after'].get('jurisdiction') or 'N/A'} · {ch['after'].get('law_or_policy') or 'N/A'}**")
-        for c in ch["changes"]:
-          st.markdown(f"  - {c['field']}: :red[`{str(c['before'])[:80]}`] → :green[`{str(c['after'])[:80]}`]")
-    with colC:
-      st.write("**삭제**")
-      if not removed: st.write("없음")
-      for it in removed:
-        st.markdown(f"- **{it.get('jurisdiction') or 'N/A'} · {it.get('law_or_policy') or 'N/A'}**")
+  summary_table()
+  change_report()
 
 # 하단 안내
 st.markdown("<div class='small-muted'>Tip: Streamlit Cloud에서는 `Settings → Secrets`에 POTENS_API_KEY를 넣어두면 안전합니다. (지금은 코드 안의 플레이스홀더를 사용 중)</div>", unsafe_allow_html=True)
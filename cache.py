@@ -0,0 +1,304 @@
+# cache.py
+# 디스크 영속 캐시 모음
+# - Streamlit Cloud에서는 작업 디렉토리 쓰기가 제한적일 수 있어 기본 경로는 /tmp 아래
+#   (POLICYLENS_DATA_DIR 환경변수로 변경 가능)
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DATA_DIR = os.getenv("POLICYLENS_DATA_DIR", os.path.join(tempfile.gettempdir(), "policylens"))
+FEED_TTL = int(os.getenv("POLICYLENS_FEED_TTL", "600"))  # 이 시간(초) 안이면 네트워크 없이 캐시 사용
+CONTENT_TTL = int(os.getenv("POLICYLENS_CONTENT_TTL", str(24*3600)))  # 원문 페이지 캐시 유효시간(초)
+CONTENT_MAX_BYTES = int(os.getenv("POLICYLENS_CONTENT_MAX_MB", "200")) * 1024 * 1024  # 디스크 상한
+CONTENT_MEM_ITEMS = 256  # 메모리 LRU 항목 수
+ACCESS_FLUSH_ITEMS = 64  # 메모리 적중 접근 시각을 디스크에 모아 쓰는 단위
+ACCESS_FLUSH_SEC = 30
+NORMALIZE_MEM_ITEMS = 512  # 정규화 결과 메모리 LRU 항목 수 (나머지는 SQLite에서 읽음)
+
+def url_key(url: str) -> str:
+    return hashlib.sha1((url or "").encode("utf-8")).hexdigest()
+
+def canonical_url(url: str) -> str:
+    """같은 문서를 가리키는 URL을 하나의 키로: 스킴/호스트 소문자, 기본 포트·프래그먼트·utm_* 제거, 쿼리 정렬"""
+    try:
+        p = urlsplit((url or "").strip())
+    except ValueError:
+        return url or ""
+    scheme, host = p.scheme.lower(), (p.hostname or "").lower()
+    port = p.port if p.port and not ((scheme == "http" and p.port == 80) or (scheme == "https" and p.port == 443)) else None
+    netloc = f"{host}:{port}" if port else host
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+                             if not k.lower().startswith("utm_")))
+    return urlunsplit((scheme, netloc, p.path or "/", query, ""))
+
+def _atomic_write(path: str, data: bytes):
+    # 동시 세션이 반쯤 쓰인 파일을 읽지 않도록 임시파일에 쓰고 교체
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+class FeedCache:
+    """
+    피드 URL별 조건부 GET 캐시 (메모리 + 디스크).
+      <dir>/<sha1>.json : {"url","etag","last_modified","fetched_at","entries"}
+      <dir>/<sha1>.body : 원본 피드 바이트
+    - fetched_at이 ttl 이내면 신선(fresh) → 네트워크 생략
+    - 오래됐으면 ETag/Last-Modified로 재검증, 304면 저장된 entries 재사용
+    """
+    def __init__(self, cache_dir=None, ttl=FEED_TTL):
+        self.dir = cache_dir or os.path.join(DATA_DIR, "feeds")
+        self.ttl = ttl
+        self._mem = {}
+        self._lock = threading.Lock()
+        self.stats = {"fresh": 0, "revalidated": 0, "miss": 0, "stale": 0}
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, url, ext):
+        return os.path.join(self.dir, f"{url_key(url)}.{ext}")
+
+    def get(self, url):
+        with self._lock:
+            hit = self._mem.get(url)
+        if hit is not None: return hit
+        try:
+            with open(self._path(url, "json"), "r", encoding="utf-8") as f:
+                hit = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._mem[url] = hit
+        return hit
+
+    def body(self, url) -> bytes:
+        try:
+            with open(self._path(url, "body"), "rb") as f:
+                return f.read()
+        except OSError:
+            return b""
+
+    def is_fresh(self, entry) -> bool:
+        return bool(entry) and (time.time() - entry.get("fetched_at", 0)) < self.ttl
+
+    def validators(self, entry) -> dict:
+        headers = {}
+        if entry and entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, entries, etag="", last_modified="", body=None):
+        entry = {"url": url, "etag": etag or "", "last_modified": last_modified or "",
+                 "fetched_at": time.time(), "entries": entries}
+        with self._lock:
+            self._mem[url] = entry
+        try:
+            if body is not None: _atomic_write(self._path(url, "body"), body)
+            _atomic_write(self._path(url, "json"), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        except OSError:
+            pass  # 디스크 실패 시 메모리 캐시만 사용
+        return entry
+
+    def touch(self, url, entry):
+        # 304 Not Modified: 본문은 그대로, 신선도 시각만 갱신
+        return self.put(url, entry["entries"], entry.get("etag"), entry.get("last_modified"))
+
+    def count(self, kind):
+        with self._lock:
+            self.stats[kind] += 1
+
+class ContentCache:
+    """
+    원문 페이지 2단 캐시: 프로세스 메모리 LRU → SQLite(<dir>/content.sqlite3)
+    - 키: canonical_url(url), 값: 원본 HTML + 추출 텍스트
+    - ttl 지난 항목은 miss 처리, 디스크 총량이 max_bytes를 넘으면 오래 안 쓴 것부터 삭제
+    - 메모리 적중의 접근 시각은 모아 두었다가 ACCESS_FLUSH_ITEMS건/ACCESS_FLUSH_SEC초마다, 그리고 삭제 직전에 디스크에 반영
+    - stats: mem_hit / disk_hit / miss / evicted
+    """
+    def __init__(self, path=None, ttl=CONTENT_TTL, max_bytes=CONTENT_MAX_BYTES, mem_items=CONTENT_MEM_ITEMS):
+        self.path = path or os.path.join(DATA_DIR, "content.sqlite3")
+        self.ttl, self.max_bytes, self.mem_items = ttl, max_bytes, mem_items
+        self._mem = OrderedDict()
+        self._touched = {}  # key → 메모리 적중 시각 (아직 accessed_at에 안 쓴 것)
+        self._flushed_at = time.time()
+        self._lock = threading.Lock()
+        self.stats = {"mem_hit": 0, "disk_hit": 0, "miss": 0, "evicted": 0}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS pages(
+            key TEXT PRIMARY KEY, url TEXT, html TEXT, text TEXT,
+            size INTEGER, fetched_at REAL, accessed_at REAL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages(accessed_at)")
+        self._db.commit()
+
+    def _remember(self, key, doc):
+        self._mem[key] = doc
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_items:
+            self._mem.popitem(last=False)
+
+    def get(self, url):
+        key, now = canonical_url(url), time.time()
+        with self._lock:
+            doc = self._mem.get(key)
+            if doc is not None and now - doc["fetched_at"] < self.ttl:
+                self._mem.move_to_end(key)
+                self._touched[key] = now
+                if len(self._touched) >= ACCESS_FLUSH_ITEMS or now - self._flushed_at >= ACCESS_FLUSH_SEC:
+                    self._flush_access()
+                    self._db.commit()
+                self.stats["mem_hit"] += 1
+                return doc
+            row = self._db.execute("SELECT html, text, fetched_at FROM pages WHERE key=?", (key,)).fetchone()
+            if row and now - row[2] < self.ttl:
+                doc = {"html": row[0], "text": row[1], "fetched_at": row[2]}
+                self._db.execute("UPDATE pages SET accessed_at=? WHERE key=?", (now, key))
+                self._db.commit()
+                self._remember(key, doc)
+                self.stats["disk_hit"] += 1
+                return doc
+            self.stats["miss"] += 1
+            return None
+
+    def put(self, url, html, text):
+        key, now = canonical_url(url), time.time()
+        doc = {"html": html, "text": text, "fetched_at": now}
+        size = len(html.encode("utf-8")) + len(text.encode("utf-8"))
+        with self._lock:
+            self._remember(key, doc)
+            self._touched.pop(key, None)
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES(?,?,?,?,?,?,?)",
+                             (key, url, html, text, size, now, now))
+            self._evict()
+            self._db.commit()
+        return doc
+
+    def _flush_access(self):
+        """모아 둔 메모리 적중 시각을 accessed_at에 반영 (lock 안에서 호출, commit은 호출 측)"""
+        if self._touched:
+            self._db.executemany("UPDATE pages SET accessed_at=? WHERE key=?",
+                                 [(at, key) for key, at in self._touched.items()])
+            self._touched.clear()
+        self._flushed_at = time.time()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size),0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes: return
+        self._flush_access()  # 자주 쓰는(메모리 적중) 페이지가 오래된 것으로 보이지 않게
+        for key, size in self._db.execute("SELECT key, size FROM pages ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes: break
+            self._db.execute("DELETE FROM pages WHERE key=?", (key,))
+            self._mem.pop(key, None)
+            total -= size
+            self.stats["evicted"] += 1
+
+class NormalizeCache:
+    """
+    Potens 정규화 결과 캐시 (SQLite: <dir>/normalize.sqlite3)
+    - 키: sha256(프롬프트 버전, 잘라낸 원문, 원문 URL) → 검증된 JSON 배열 + 호출 소요시간
+    - 프롬프트 버전이 키에 포함되므로 템플릿 변경 시 자동 무효화
+    - SQLite 앞단에 최근 mem_items건만 메모리 LRU로 유지
+    """
+    def __init__(self, path=None, mem_items=NORMALIZE_MEM_ITEMS):
+        self.path = path or os.path.join(DATA_DIR, "normalize.sqlite3")
+        self.mem_items = mem_items
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "saved_sec": 0.0}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS normalized(
+            key TEXT PRIMARY KEY, prompt_version TEXT, origin TEXT,
+            items TEXT, elapsed REAL, created_at REAL)""")
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is None:
+                row = self._db.execute("SELECT items, elapsed, created_at FROM normalized WHERE key=?", (key,)).fetchone()
+                if row:
+                    hit = {"items": json.loads(row[0]), "elapsed": row[1], "created_at": row[2]}
+                    self._remember(key, hit)
+            else:
+                self._mem.move_to_end(key)
+            if hit is None:
+                self.stats["miss"] += 1
+                return None
+            self.stats["hit"] += 1
+            self.stats["saved_sec"] += hit["elapsed"] or 0.0
+            return hit
+
+    def _remember(self, key, hit):
+        self._mem[key] = hit
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_items:
+            self._mem.popitem(last=False)
+
+    def has(self, key) -> bool:
+        with self._lock:
+            if key in self._mem: return True
+            return self._db.execute("SELECT 1 FROM normalized WHERE key=?", (key,)).fetchone() is not None
+
+    def put(self, key, items, prompt_version="", origin="", elapsed=0.0):
+        hit = {"items": items, "elapsed": elapsed, "created_at": time.time()}
+        with self._lock:
+            self._remember(key, hit)
+            self._db.execute("INSERT OR REPLACE INTO normalized VALUES(?,?,?,?,?,?)",
+                             (key, prompt_version, origin, json.dumps(items, ensure_ascii=False),
+                              elapsed, hit["created_at"]))
+            self._db.commit()
+        return hit
+
+class IngestIndex:
+    """
+    증분 수집 인덱스 (SQLite: <dir>/ingest.sqlite3) — 브라우저 새로고침/재시작 후에도 유지
+    - 링크(canonical)별: 목록 지문(제목+게시일), 추출 텍스트 해시, 마지막 정규화 결과
+    - 지문이 같으면 원문을 다시 받지 않고, 텍스트 해시가 같으면 다시 정규화하지 않는다
+    """
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, "ingest.sqlite3")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS entries(
+            key TEXT PRIMARY KEY, link TEXT, title TEXT, pub_date TEXT, fingerprint TEXT,
+            content_hash TEXT, items TEXT, first_seen REAL, last_seen REAL, updated_at REAL)""")
+        self._db.commit()
+
+    @staticmethod
+    def fingerprint(row: dict) -> str:
+        return hashlib.sha1(f"{row.get('title','')}|{row.get('pubDate','')}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+    def lookup(self, link):
+        with self._lock:
+            row = self._db.execute("SELECT fingerprint, content_hash, items FROM entries WHERE key=?",
+                                   (canonical_url(link),)).fetchone()
+        if not row: return None
+        return {"fingerprint": row[0], "content_hash": row[1], "items": json.loads(row[2] or "[]")}
+
+    def record(self, row: dict, content_hash: str, items):
+        key, now = canonical_url(row["link"]), time.time()
+        with self._lock:
+            self._db.execute("""INSERT INTO entries VALUES(?,?,?,?,?,?,?,?,?,?)
+                ON CONFLICT(key) DO UPDATE SET title=excluded.title, pub_date=excluded.pub_date,
+                  fingerprint=excluded.fingerprint, content_hash=excluded.content_hash,
+                  items=excluded.items, last_seen=excluded.last_seen, updated_at=excluded.updated_at""",
+                (key, row["link"], row.get("title",""), row.get("pubDate",""), self.fingerprint(row),
+                 content_hash, json.dumps(items, ensure_ascii=False), now, now, now))
+            self._db.commit()
+
+    def touch(self, link):
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_seen=? WHERE key=?", (time.time(), canonical_url(link)))
+            self._db.commit()
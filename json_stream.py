@@ -0,0 +1,173 @@
+# json_stream.py
+# LLM 응답용 관대한(tolerant) 증분 JSON 파서 (09.05·루트 normalizer.py, 09.10/app.py — 폴더마다 같은 파일)
+# - 조각(chunk)을 feed()로 넣을 때마다 완성된 부분을 이벤트로 돌려준다
+#     ("partial", key, text)      최상위 객체의 문자열 필드가 아직 들어오는 중 (예: answer 타이핑 효과)
+#     ("field", key, value)       최상위 객체의 필드 하나가 완성됨
+#     ("item", key, index, value) 최상위 배열 필드(key)의 원소 하나가 완성됨 (최상위가 배열이면 key=None)
+#     ("done", value)             최상위 값 전체가 완성됨
+# - 첫 '{' / '[' 앞의 잡문(```json 코드펜스, 안내 문장 등)은 건너뜀
+# - 응답이 중간에 잘려도 recovered()로 그때까지 닫힌 필드/원소를 살림 (+ 진행 중이던 최상위 문자열 필드)
+# - 깨진 원소(JSON 문법 오류)는 건너뛰고 나머지 원소는 유지
+
+import json
+
+_INVALID = object()
+
+class StreamingJSONParser:
+    def __init__(self, expect="{["):
+        """expect: 최상위 값으로 인정할 시작 문자 ("[" 이면 배열만, "{" 이면 객체만)"""
+        self.expect = expect
+        self.buf = ""
+        self.pos = 0
+        self.stack = []          # 열린 컨테이너: {"kind","key","expect_key","vstart","scalar","index"}
+        self.root_start = None
+        self.done = False
+        self.value = None
+        self._str_start = None   # 문자열 안이면 여는 따옴표 위치
+        self._str_is_key = False
+        self._escape = False
+        self._collected = None   # 지금까지 닫힌 최상위 필드/원소 (잘린 응답 복구용)
+
+    # --- 내부: 값 하나가 끝났을 때 ---
+    def _finish(self, end, events):
+        frame = self.stack[-1]
+        start, frame["vstart"], frame["scalar"] = frame["vstart"], None, False
+        depth = len(self.stack)
+        if start is None: return
+        if depth == 1:
+            val = self._loads(start, end)
+            if val is _INVALID: return
+            if frame["kind"] == "{":
+                self._collected[frame["key"]] = val
+                events.append(("field", frame["key"], val))
+            else:
+                self._collected.append(val)
+                events.append(("item", None, frame["index"], val))
+        elif depth == 2 and frame["kind"] == "[" and self.stack[0]["kind"] == "{":
+            val = self._loads(start, end)
+            if val is _INVALID: return
+            self._collected.setdefault(self.stack[0]["key"], [])
+            if isinstance(self._collected[self.stack[0]["key"]], list):
+                self._collected[self.stack[0]["key"]].append(val)
+            events.append(("item", self.stack[0]["key"], frame["index"], val))
+        if frame["kind"] == "[": frame["index"] += 1
+
+    def _loads(self, start, end):
+        try:
+            return json.loads(self.buf[start:end])
+        except ValueError:
+            return _INVALID
+
+    def _in_value_pos(self):
+        top = self.stack[-1]
+        return top["kind"] == "[" or not top["expect_key"]
+
+    def feed(self, chunk: str):
+        """조각을 추가하고 새로 완성된 이벤트 리스트를 반환"""
+        events = []
+        if self.done or not chunk: return events
+        self.buf += chunk
+        buf, i = self.buf, self.pos
+        while i < len(buf) and not self.done:
+            c = buf[i]
+            if self._str_start is not None:  # 문자열 내부
+                if self._escape: self._escape = False
+                elif c == "\\": self._escape = True
+                elif c == '"':
+                    start, self._str_start = self._str_start, None
+                    top = self.stack[-1]
+                    if self._str_is_key:
+                        key = self._loads(start, i + 1)
+                        top["key"] = self.buf[start + 1:i] if key is _INVALID else key
+                    else: self._finish(i + 1, events)
+                i += 1
+                continue
+            if self.root_start is None:  # 최상위 값 시작 전 잡문
+                if c in self.expect:
+                    self.root_start = i
+                    self.stack.append(self._frame(c))
+                    self._collected = {} if c == "{" else []
+                i += 1
+                continue
+            top = self.stack[-1]
+            if top["scalar"] and (c in ",]}" or c.isspace()):
+                self._finish(i, events)
+            if c in "{[":
+                if self._in_value_pos(): top["vstart"] = i
+                self.stack.append(self._frame(c))
+            elif c in "]}":
+                self.stack.pop()
+                if not self.stack:
+                    self.done = True
+                    value = self._loads(self.root_start, i + 1)
+                    self.value = self._collected if value is _INVALID else value  # 문법 오류 → 살린 부분만
+                    events.append(("done", self.value))
+                else:
+                    self._finish(i + 1, events)
+            elif c == ",":
+                if top["kind"] == "{": top["expect_key"] = True
+            elif c == ":":
+                top["expect_key"] = False
+            elif c == '"':
+                self._str_start, self._escape = i, False
+                self._str_is_key = top["kind"] == "{" and top["expect_key"]
+                if not self._str_is_key: top["vstart"] = i
+            elif not c.isspace() and top["vstart"] is None and self._in_value_pos():
+                top["vstart"], top["scalar"] = i, True  # 숫자/true/false/null
+            i += 1
+        self.pos = i
+        # 최상위 객체의 문자열 필드가 진행 중이면 지금까지의 내용을 partial로
+        if self._str_start is not None and not self._str_is_key and len(self.stack) == 1 and self.stack[0]["kind"] == "{":
+            text = self._partial_string(self._str_start)
+            if text is not None: events.append(("partial", self.stack[0]["key"], text))
+        return events
+
+    def recovered(self):
+        """
+        지금까지 읽은 부분으로 만들 수 있는 최선의 값. 끝까지 읽었으면 전체 값.
+        잘렸으면 닫힌 필드/원소만 (최상위 문자열 필드가 진행 중이었다면 그 앞부분까지 포함). 시작도 못 했으면 None.
+        """
+        if self.done: return self.value
+        if self._collected is None: return None
+        out = dict(self._collected) if isinstance(self._collected, dict) else list(self._collected)
+        if isinstance(out, dict):
+            for k, v in out.items():
+                if isinstance(v, list): out[k] = list(v)
+            if self._str_start is not None and not self._str_is_key and len(self.stack) == 1:
+                text = self._partial_string(self._str_start)
+                if text: out[self.stack[0]["key"]] = text
+        return out
+
+    @staticmethod
+    def _frame(kind):
+        return {"kind": kind, "key": None, "expect_key": kind == "{", "vstart": None, "scalar": False, "index": 0}
+
+    def _partial_string(self, start):
+        raw = self.buf[start:]
+        for cut in range(0, 7):  # 끝에 잘린 이스케이프(\u12 등)는 떼고 해석
+            try:
+                return json.loads(raw[:len(raw) - cut] + '"')
+            except ValueError:
+                continue
+        return None
+
+def iter_events(chunks, expect="{["):
+    """문자열 조각들(iterable) → 이벤트를 완성되는 대로 yield"""
+    parser = StreamingJSONParser(expect)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done: return
+
+def iter_items(chunks):
+    """최상위 배열의 원소를 닫히는 대로 yield (배열 앞뒤 잡문·잘린 꼬리는 무시)"""
+    for ev in iter_events(chunks, expect="["):
+        if ev[0] == "item": yield ev[3]
+
+def tolerant_loads(text, expect="{["):
+    """
+    LLM 응답 문자열 → (값, 완결 여부).
+    코드펜스/앞뒤 잡문 허용, 잘린 응답은 닫힌 부분만 복구(완결 여부 False). JSON이 아예 없으면 (None, False).
+    """
+    parser = StreamingJSONParser(expect)
+    parser.feed(text or "")
+    return parser.recovered(), parser.done
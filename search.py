@@ -0,0 +1,155 @@
+# search.py
+# 수집 이력 전체에 대한 키워드 색인 (SQLite FTS5: <DATA_DIR>/search.sqlite3)
+# - 지금까지 수집한 모든 항목의 제목/요약/원문 텍스트를 누적 색인
+# - 토큰화: 영문/숫자는 단어 단위, 한글은 글자 2-gram → "재생에너지보급" 같은 복합어 안의 "에너지"도 검색됨
+# - 질의: 공백 = AND, "OR" 또는 "|" = OR  (예: "solar 관세 OR tariff")
+# - 지역/게시일 필터 + BM25 순위(제목 > 요약 > 본문 가중치)
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from cache import DATA_DIR
+
+BODY_CHARS = 20000                 # 본문은 앞부분만 색인
+FIELD_WEIGHTS = (3.0, 1.5, 1.0)    # bm25 가중치: title, summary, body
+_WORD = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+
+def tokenize(text: str):
+    """텍스트 → 색인 토큰 리스트. 한글 연속 구간은 2-gram(한 글자면 그대로), 그 외는 소문자 단어."""
+    out = []
+    for w in _WORD.findall((text or "").lower()):
+        if "가" <= w[0] <= "힣" and len(w) > 1:
+            out.extend(w[i:i+2] for i in range(len(w) - 1))
+        else:
+            out.append(w)
+    return out
+
+def _term_expr(term: str) -> str:
+    """검색어 하나 → FTS5 식. 한글은 2-gram 구문 일치(= 부분 문자열), 영문은 접두어 일치."""
+    parts = []
+    for w in _WORD.findall(term.lower()):
+        if "가" <= w[0] <= "힣":
+            grams = tokenize(w)
+            parts.append(f'"{" ".join(grams)}"' + ("*" if len(w) == 1 else ""))
+        else:
+            parts.append(f'"{w}"*')
+    return " AND ".join(parts)
+
+def build_match(query: str) -> str:
+    """공백 = AND, OR/| = OR. 유효한 검색어가 없으면 ""."""
+    groups = [[]]
+    for tok in (query or "").replace("|", " | ").split():
+        if tok in ("OR", "|"):
+            groups.append([])
+        elif tok != "AND":
+            expr = _term_expr(tok)
+            if expr: groups[-1].append(f"({expr})")
+    ors = [" AND ".join(g) for g in groups if g]
+    return " OR ".join(f"({g})" for g in ors)
+
+def parse_date(value: str):
+    """RSS/ISO 날짜 문자열 → epoch 초 (실패 시 None)"""
+    value = (value or "").strip()
+    if not value: return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except Exception:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return None
+
+class SearchIndex:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, "search.sqlite3")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS docs(
+                id INTEGER PRIMARY KEY, link TEXT UNIQUE, title TEXT, summary TEXT, pubDate TEXT,
+                ts REAL, region TEXT, source TEXT);
+            CREATE INDEX IF NOT EXISTS docs_ts ON docs(ts);
+            CREATE VIRTUAL TABLE IF NOT EXISTS terms USING fts5(title, summary, body);
+        """)
+        self._db.commit()
+
+    def _index(self, doc_id, title, summary, body):
+        self._db.execute("DELETE FROM terms WHERE rowid = ?", (doc_id,))
+        self._db.execute("INSERT INTO terms(rowid, title, summary, body) VALUES(?,?,?,?)",
+                         (doc_id, " ".join(tokenize(title)), " ".join(tokenize(summary)), body))
+
+    def add_entries(self, entries):
+        """목록 항목 누적 색인. 제목/요약이 바뀐 항목만 다시 색인한다."""
+        now = time.time()
+        with self._lock:
+            for e in entries:
+                title, summary = e.get("title") or "", e.get("summary") or ""
+                row = self._db.execute("SELECT id, title, summary FROM docs WHERE link = ?", (e["link"],)).fetchone()
+                if row and row[1] == title and row[2] == summary: continue
+                ts = parse_date(e.get("pubDate"))
+                if row:
+                    doc_id = row[0]
+                    self._db.execute("UPDATE docs SET title=?, summary=?, pubDate=?, ts=COALESCE(?, ts), region=?, source=? WHERE id=?",
+                                     (title, summary, e.get("pubDate") or "", ts, e.get("region") or "", e.get("source") or "", doc_id))
+                    body = self._db.execute("SELECT body FROM terms WHERE rowid = ?", (doc_id,)).fetchone()
+                    body = body[0] if body else ""
+                else:
+                    doc_id = self._db.execute(
+                        "INSERT INTO docs(link, title, summary, pubDate, ts, region, source) VALUES(?,?,?,?,?,?,?)",
+                        (e["link"], title, summary, e.get("pubDate") or "", ts or now, e.get("region") or "", e.get("source") or "")).lastrowid
+                    body = ""
+                self._index(doc_id, title, summary, body)
+            self._db.commit()
+
+    def add_body(self, row: dict, text: str):
+        """원문 추출 텍스트를 해당 항목의 본문으로 색인 (목록에 없던 항목이면 함께 등록)."""
+        find = lambda: self._db.execute("SELECT id, title, summary FROM docs WHERE link = ?", (row["link"],)).fetchone()
+        with self._lock:
+            doc = find()
+        if not doc:
+            self.add_entries([row])
+        with self._lock:
+            doc = doc or find()
+            if not doc: return
+            self._index(doc[0], doc[1], doc[2], " ".join(tokenize((text or "")[:BODY_CHARS])))
+            self._db.commit()
+
+    def search(self, query="", regions=None, since=None, until=None, limit=60):
+        """
+        누적 색인 검색 → 목록 항목 dict 리스트 (점수 순, 동점은 최신 순).
+        regions: 지역 리스트, since/until: epoch 초. 검색어가 없으면 필터만 적용해 최신 순.
+        """
+        match = build_match(query)
+        where, args = [], []
+        if regions:
+            where.append(f"d.region IN ({','.join('?' * len(regions))})"); args.extend(regions)
+        if since is not None: where.append("d.ts >= ?"); args.append(since)
+        if until is not None: where.append("d.ts < ?"); args.append(until)
+        cols = "d.title, d.link, d.pubDate, d.source, d.region, d.summary"
+        if match:
+            sql = (f"SELECT {cols}, bm25(terms, {', '.join(map(str, FIELD_WEIGHTS))}) AS score "
+                   f"FROM terms JOIN docs d ON d.id = terms.rowid WHERE terms MATCH ? "
+                   + "".join(f" AND {w}" for w in where) + " ORDER BY score, d.ts DESC LIMIT ?")
+            args = [match] + args
+        elif (query or "").strip():
+            return []  # 색인 가능한 글자가 없는 검색어
+        else:
+            sql = (f"SELECT {cols}, 0 FROM docs d" + (" WHERE " + " AND ".join(where) if where else "")
+                   + " ORDER BY d.ts DESC LIMIT ?")
+        with self._lock:
+            rows = self._db.execute(sql, args + [limit]).fetchall()
+        return [{"title": r[0], "link": r[1], "pubDate": r[2], "source": r[3], "region": r[4], "summary": r[5],
+                 "score": round(-r[6], 3)} for r in rows]
+
+    def size(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+SEARCH_INDEX = SearchIndex()  # 프로세스 공용
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+os.environ.setdefault("POLICYLENS_DATA_DIR", tempfile.mkdtemp(prefix="policylens-test-"))
+
+import pipeline
+from cache import IngestIndex
+
+ROW = {"region": "KR", "title": "태양광 보조금 고시", "link": "https://example.go.kr/notice/1", "pubDate": ""}
+ITEMS = [{"jurisdiction": "KR", "law_or_policy": "태양광 보조금 고시"}]
+
+def _no_potens(*args, **kwargs):
+    raise AssertionError("빈 본문으로 Potens를 호출하면 안 됨")
+
+def test_failed_download_keeps_indexed_items(tmp_path, monkeypatch):
+    index = IngestIndex(str(tmp_path / "ingest.sqlite3"))
+    index.record(ROW, index.content_hash("원문"), ITEMS)
+    monkeypatch.setattr(pipeline, "fetch_text", lambda url: "")
+    monkeypatch.setattr(pipeline, "normalize_with_ai", _no_potens)
+    monkeypatch.setattr(pipeline, "normalize_batch", _no_potens)
+
+    job = pipeline.prepare_row(ROW, incremental=True, index=index)
+    assert job["status"] == "unchanged"
+    assert job["items"] == ITEMS
+    items, status = pipeline.finish_row(job, index=index)
+    assert status == "unchanged"
+    assert [it["law_or_policy"] for it in items] == ["태양광 보조금 고시"]
+    seen = index.lookup(ROW["link"])
+    assert seen["content_hash"] == index.content_hash("원문")
+    assert seen["items"] == ITEMS
+
+def test_failed_download_of_new_row_is_not_recorded(tmp_path, monkeypatch):
+    index = IngestIndex(str(tmp_path / "ingest.sqlite3"))
+    monkeypatch.setattr(pipeline, "fetch_text", lambda url: "")
+    monkeypatch.setattr(pipeline, "normalize_with_ai", _no_potens)
+
+    job = pipeline.prepare_row(ROW, incremental=True, index=index)
+    items, status = pipeline.finish_row(job, index=index)
+    assert status == "new"
+    assert items[0]["law_or_policy"] == ROW["title"]  # 제목 기반 폴백 항목
+    assert index.lookup(ROW["link"]) is None